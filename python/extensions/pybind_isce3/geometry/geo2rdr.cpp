@@ -93,11 +93,16 @@ void addbinding_geo2rdr(pybind11::module& m)
             double threshold, int maxiter, double delta_range) {
                 auto side = duck_look_side(py_side);
                 double aztime, slant_range;
-                int converged = geo2rdr(
-                        lon_lat_height, ellipsoid, orbit, doppler,
-                        aztime, slant_range,
-                        wavelength, side,
-                        threshold, maxiter, delta_range);
+                int converged;
+                {
+                    // allow concurrent solves from Python threads
+                    py::gil_scoped_release release;
+                    converged = geo2rdr(
+                            lon_lat_height, ellipsoid, orbit, doppler,
+                            aztime, slant_range,
+                            wavelength, side,
+                            threshold, maxiter, delta_range);
+                }
                 if (!converged)
                     throw std::runtime_error("geo2rdr failed to converge");
                 return std::make_pair(aztime, slant_range);
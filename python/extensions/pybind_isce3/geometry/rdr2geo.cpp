@@ -110,10 +110,15 @@ void addbinding_rdr2geo(py::module& m)
                 auto side = duck_look_side(pySide);
                 auto opt = handle_r2g_kwargs(r2g_kw);
                 Vec3 targetLLH;
-                int converged =
-                    rdr2geo(aztime, range, doppler, orbit, ellipsoid, dem,
-                        targetLLH, wavelength, side, opt.threshold, opt.maxiter,
-                        opt.extraiter);
+                int converged;
+                {
+                    // allow concurrent solves from Python threads
+                    py::gil_scoped_release release;
+                    converged =
+                        rdr2geo(aztime, range, doppler, orbit, ellipsoid, dem,
+                            targetLLH, wavelength, side, opt.threshold,
+                            opt.maxiter, opt.extraiter);
+                }
                 if (!converged)
                     throw std::runtime_error("rdr2geo failed to converge");
                 return targetLLH;
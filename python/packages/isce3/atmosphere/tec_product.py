@@ -1,40 +1,261 @@
 '''
 Package to compute TEC LUT from JSON file
 '''
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
 import os
 
 import numpy as np
 import journal
+try:
+    # orjson parses float-heavy payloads much faster than stdlib json
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 import isce3
-from isce3.geometry import compute_incidence_angle
 
 
-def _compute_ionospheric_range_delay(utc_time: list, tec_json: dict, nr_fr: str,
-                                     nr_fr_rg: float, center_freq: float,
+def _file_cache_key(path: str):
+    '''
+    Get key identifying the current contents of a local file for caching
+
+    Parameters
+    ----------
+    path: str
+        Path to local file
+
+    Returns
+    -------
+    tuple
+        Canonical absolute path of file, its modification time in nanoseconds
+        and its size in bytes
+    '''
+    stat = os.stat(path)
+    return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+
+@functools.lru_cache(maxsize=8)
+def _load_tec_json(json_path: str, mtime_ns: int, size: int):
+    '''
+    Load TEC JSON and convert its contents to arrays
+
+    Results are cached on canonical path, modification time and size so
+    repeated calls on an unchanged file skip reading and parsing it again.
+    Use _file_cache_key to get the arguments.
+
+    Parameters
+    ----------
+    json_path: str
+        Canonical path to JSON file containing TEC data
+    mtime_ns: int
+        Modification time of JSON file in nanoseconds. Only used as part of
+        the cache key.
+    size: int
+        Size of JSON file in bytes. Only used as part of the cache key.
+
+    Returns
+    -------
+    np.ndarray
+        UTC times of TEC data as datetime64[us]
+    np.ndarray
+        Sub orbital TEC with near and far range as columns
+    '''
+    with open(json_path, 'rb') as fid:
+        tec_json = _json_loads(fid.read())
+
+    utc_time = np.asarray(tec_json['utc'], dtype='datetime64[us]')
+
+    # compute near and far sub orbital TEC from total and top TEC in JSON
+    # Fill columns of a C-ordered array directly as LUT2d requires C-order
+    sub_orbital_tec = np.empty((len(utc_time), 2), dtype=np.float64,
+                               order='C')
+    for i, nr_fr in enumerate(['Nr', 'Fr']):
+        np.subtract(tec_json[f'totTec{nr_fr}'], tec_json[f'topTec{nr_fr}'],
+                    out=sub_orbital_tec[:, i])
+
+    # Cached arrays are shared between callers; guard against modification
+    utc_time.setflags(write=False)
+    sub_orbital_tec.setflags(write=False)
+
+    return utc_time, sub_orbital_tec
+
+
+@functools.lru_cache(maxsize=32)
+def _epsg_for_path(dem_path: str, mtime_ns: int, size: int):
+    '''
+    Get EPSG code of a local DEM raster file
+
+    Cached on canonical path, modification time and size so repeated calls
+    on an unchanged DEM do not reopen it. Use _file_cache_key to get the
+    arguments.
+
+    Parameters
+    ----------
+    dem_path: str
+        Canonical path to DEM raster file
+    mtime_ns: int
+        Modification time of DEM raster in nanoseconds. Only used as part of
+        the cache key.
+    size: int
+        Size of DEM raster in bytes. Only used as part of the cache key.
+
+    Returns
+    -------
+    int
+        EPSG code of DEM raster
+    '''
+    return isce3.io.Raster(dem_path).get_epsg()
+
+
+@functools.lru_cache(maxsize=32)
+def _proj_for_epsg(epsg: int):
+    '''
+    Get projection and its ellipsoid for an EPSG code
+
+    Cached so repeated calls with the same EPSG code reuse the same objects.
+
+    Parameters
+    ----------
+    epsg: int
+        EPSG code of projection
+
+    Returns
+    -------
+    isce3.core.ProjectionBase
+        Projection for EPSG code
+    isce3.core.Ellipsoid
+        Ellipsoid of projection
+    '''
+    proj = isce3.core.make_projection(epsg)
+    return proj, proj.ellipsoid
+
+
+def _compute_incidence_angles(utc_time: np.ndarray, slant_ranges: list,
+                              orbit: isce3.core.Orbit,
+                              doppler_lut: isce3.core.LUT2d,
+                              radar_grid: isce3.product.RadarGridParameters,
+                              dem_interp: isce3.geometry.DEMInterpolator,
+                              ellipsoid: isce3.core.Ellipsoid,
+                              n_workers: int=None):
+    '''
+    Compute incidence angles over an array of UTC times and slant ranges
+
+    Batched equivalent of isce3.geometry.compute_incidence_angle. Orbit
+    interpolation is done once per time and shared by all slant ranges; only
+    the rdr2geo solve is done per time and range. UTC times are split into
+    contiguous chunks that are solved concurrently; rdr2geo releases the GIL.
+    Positions are stored as separate coordinate arrays so the ECEF conversion,
+    ENU projection and incidence angle are evaluated on whole arrays with the
+    trigonometric terms of the target frames computed only once.
+
+    Parameters
+    ----------
+    utc_time: np.ndarray
+        UTC times as seconds after SLC epoch to compute incidence angles for
+    slant_ranges: list
+        Slant ranges to compute incidence angles for
+    orbit: isce3.core.Orbit
+        Orbit for associated SLC
+    doppler_lut: isce3.core.LUT2d
+        Doppler centroid of SLC
+    radar_grid: isce3.product.RadarGridParameters
+        Radar grid for associated SLC
+    dem_interp: isce3.geometry.DEMInterpolator
+        Digital elevation model, m above ellipsoid. Defaults to h=0.
+    ellipsoid: isce3.core.Ellipsoid
+        Ellipsoid with same EPSG as DEM interpolator
+    n_workers: int
+        Number of threads used to solve rdr2geo. Defaults to number of CPUs.
+
+    Returns
+    -------
+    np.ndarray
+        Incidence angles in radians with shape (len(utc_time),
+        len(slant_ranges))
+    '''
+    n_times = len(utc_time)
+    n_ranges = len(slant_ranges)
+
+    # Coordinate-major layout, i.e. x, y, z (lon, lat, hgt) each contiguous
+    sat_pos = np.empty((3, n_times, 1))
+    target_llh = np.empty((3, n_times, n_ranges))
+
+    # Radar grid attributes are invariant over time; fetch them only once
+    lookside = radar_grid.lookside
+    wavelength = radar_grid.wavelength
+
+    def solve_chunk(i_start, i_stop):
+        # Each chunk only writes to its own rows of the output arrays
+        for i in range(i_start, i_stop):
+            t = utc_time[i]
+            sat_pos[:, i, 0], _ = orbit.interpolate(t)
+            for j, srange in enumerate(slant_ranges):
+                doppler = doppler_lut.eval(t, srange)
+                target_llh[:, i, j] = isce3.geometry.rdr2geo(t, srange, orbit,
+                                                             lookside,
+                                                             doppler,
+                                                             wavelength,
+                                                             dem_interp)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, n_times))
+    bounds = np.linspace(0, n_times, n_workers + 1).astype(int)
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # Consume results so exceptions from workers are raised here
+        list(executor.map(solve_chunk, bounds[:-1], bounds[1:]))
+
+    # Trigonometric terms shared by ECEF conversion and local ENU frame
+    lon, lat, hgt = target_llh
+    cos_lat = np.cos(lat)
+    sin_lat = np.sin(lat)
+    cos_lon = np.cos(lon)
+    sin_lon = np.sin(lon)
+
+    # Up component of the local ENU basis at each target, i.e. the last row
+    # of isce3.core.xyz_to_enu(lat, lon)
+    up_x = cos_lat * cos_lon
+    up_y = cos_lat * sin_lon
+    up_z = sin_lat
+
+    # Target ECEF coordinates, same as ellipsoid.lon_lat_to_xyz
+    e2 = ellipsoid.e2
+    r_east = ellipsoid.a / np.sqrt(1.0 - e2 * sin_lat**2)
+
+    # Vector from satellite to ground
+    dx = (r_east + hgt) * up_x - sat_pos[0]
+    dy = (r_east + hgt) * up_y - sat_pos[1]
+    dz = (r_east * (1.0 - e2) + hgt) * up_z - sat_pos[2]
+
+    # ENU rotation preserves norm so the ECEF vector norm can be used as is
+    cosalpha = (np.abs(up_x * dx + up_y * dy + up_z * dz) /
+                np.sqrt(dx * dx + dy * dy + dz * dz))
+    return np.arccos(cosalpha, out=cosalpha)
+
+
+def _compute_ionospheric_range_delay(utc_time: np.ndarray,
+                                     sub_orbital_tec: np.ndarray,
+                                     slant_ranges: list,
+                                     center_freq: float,
                                      orbit: isce3.core.Orbit,
                                      doppler_lut: isce3.core.LUT2d,
                                      radar_grid: isce3.product.RadarGridParameters,
                                      dem_interp: isce3.geometry.DEMInterpolator,
                                      ellipsoid: isce3.core.Ellipsoid,
-                                     tec_time_mask: list):
+                                     out: np.ndarray=None):
     '''
-    Compute near or far TEC delta range
+    Compute near and far TEC delta range
 
     Parameters
     ----------
-    utc_time: list
+    utc_time: np.ndarray
         UTC times as seconds after SLC epoch to compute TEC delta range over
-    tec_json: dict
-        TEC JSON as a dict. Keys are TEC parameters and values are the values
-        of said parameter.
-    nr_fr: ['Nr', 'Fr']
-        String values used to access Near or Far TEC parameters in TEC JSON
-        dict
-    nr_fr_rg: float
-        Near or far range of the radar grid
+    sub_orbital_tec: np.ndarray
+        Sub orbital TEC at utc_time with near and far range as columns
+    slant_ranges: list
+        Near and far range of the radar grid
     center_freq: float
         Processed center frequency of swath (Hz)
     orbit: isce3.core.Orbit
@@ -47,41 +268,43 @@ def _compute_ionospheric_range_delay(utc_time: list, tec_json: dict, nr_fr: str,
         Digital elevation model, m above ellipsoid. Defaults to h=0.
     ellipsoid: isce3.core.Ellipsoid
         Ellipsoid with same EPSG as DEM interpolator
-    tec_time_mask: list
-        List of bools to extract valid total and top TEC values
+    out: np.ndarray
+        Optional float64 array with same shape as sub_orbital_tec to write
+        TEC delta range into. Default None allocates a new array.
 
     Returns
     -------
     np.ndarray
-        TEC delta range
+        TEC delta range with near and far range as columns
     '''
-    # compute sub orbital TEC from total and top TEC in JSON
-    tot_tec = np.array(tec_json[f'totTec{nr_fr}'])
-    top_tec = np.array(tec_json[f'topTec{nr_fr}'])
-    sub_orbital_tec = tot_tec - top_tec
-    sub_orbital_tec = np.array([tec
-                                for tec, m in zip(sub_orbital_tec,
-                                                  tec_time_mask)
-                                if m])
+    utc_time = np.asarray(utc_time, dtype=np.float64)
+    sub_orbital_tec = np.asarray(sub_orbital_tec, dtype=np.float64)
 
     # constants used compute ionospheric range delay
     K = 40.31 # its a constant in m3/s2
     TECU = 1e16 # its a constant to convert the TEC product to electrons / m2
 
-    incidence = [compute_incidence_angle(t, nr_fr_rg, orbit, doppler_lut,
-                                         radar_grid, dem_interp, ellipsoid)
-                 for t in utc_time]
+    # Incidence angles for near and far range computed in a single pass
+    incidence = _compute_incidence_angles(utc_time, slant_ranges, orbit,
+                                          doppler_lut, radar_grid, dem_interp,
+                                          ellipsoid)
+
+    # Fold scalar constants so only one array multiply remains
+    scale = (K * TECU) / (center_freq * center_freq)
 
-    delta_r = K * sub_orbital_tec * TECU / center_freq**2 / np.cos(incidence)
+    # incidence is no longer needed; reuse its buffer for the scaled secant
+    scaled_sec = np.divide(scale, np.cos(incidence, out=incidence),
+                           out=incidence)
 
-    return delta_r
+    return np.multiply(scaled_sec, sub_orbital_tec, out=out)
 
 
 def tec_lut2d_from_json(json_path: str, center_freq: float,
                         orbit: isce3.core.Orbit,
                         radar_grid: isce3.product.RadarGridParameters,
                         doppler_lut: isce3.core.LUT2d, dem_path: str,
-                        margin: float=40.0) -> isce3.core.LUT2d:
+                        margin: float=40.0,
+                        epsg: int=None) -> isce3.core.LUT2d:
     '''
     Create a TEC LUT2d from a JSON source
 
@@ -102,6 +325,9 @@ def tec_lut2d_from_json(json_path: str, center_freq: float,
     margin: float
         Margin (seconds) to pad to sensing start and stop times when extracting
         TEC data. Default 40 seconds.
+    epsg: int
+        EPSG code of DEM. If provided, the DEM raster is not opened to
+        determine it. Default None.
 
     Returns
     -------
@@ -114,27 +340,57 @@ def tec_lut2d_from_json(json_path: str, center_freq: float,
         err_str = f'TEC JSON path not found: {json_path}'
         error_channel.log(err_str)
 
-    with open(json_path, 'r') as fid:
-        tec_json = json.load(fid)
+    utc_time, sub_orbital_tec = _load_tec_json(*_file_cache_key(json_path))
 
-    # Save UTC time as total seconds since reference epoch of radar grid
-    ref_epoch = datetime.fromisoformat(radar_grid.ref_epoch.isoformat()[:-3])
-    utc_time = [(datetime.fromisoformat(t) - ref_epoch).total_seconds()
-                for t in tec_json['utc']]
+    # Save UTC time as total seconds since reference epoch of radar grid.
+    # Build reference epoch from DateTime fields, truncated to microseconds
+    ref = radar_grid.ref_epoch
+    ref_epoch = (np.datetime64(f'{ref.year:04d}-{ref.month:02d}-{ref.day:02d}',
+                               'us')
+                 + np.timedelta64(3600 * ref.hour + 60 * ref.minute
+                                  + ref.second, 's')
+                 + np.timedelta64(int(round(ref.frac * 1e9)) // 1000, 'us'))
+    utc_time = (utc_time - ref_epoch) / np.timedelta64(1, 's')
 
     # Filter utc_time to only save times near radar_grid.
     # Pad data before and after to ensure enough TEC data is collected.
     # Pad with length of one burst should suffice.
     t_lower_bound = radar_grid.sensing_start - margin
     t_upper_bound = radar_grid.sensing_stop + margin
-    time_mask = [t >= t_lower_bound and t <= t_upper_bound for t in utc_time]
-    utc_time = [t for t, m in zip(utc_time, time_mask) if m]
+    time_mask = (utc_time >= t_lower_bound) & (utc_time <= t_upper_bound)
+    valid_idx = np.flatnonzero(time_mask)
 
-    # Load DEM into interpolator and get ellipsoid object from DEM EPSG
-    dem_raster = isce3.io.Raster(dem_path)
-    epsg = dem_raster.get_epsg()
-    proj = isce3.core.make_projection(epsg)
-    ellipsoid = proj.ellipsoid
+    # Bail out before any DEM I/O or geometry if TEC does not cover the grid.
+    # Raise directly since logging to the (fatal) error channel would raise
+    # its own exception first.
+    if valid_idx.size == 0:
+        err_str = (f'TEC JSON {json_path} has no data between '
+                   f'{t_lower_bound} and {t_upper_bound} seconds after '
+                   'radar grid reference epoch')
+        raise ValueError(err_str)
+
+    # TEC times are normally sorted so valid samples form a single run. Use
+    # a slice in that case so the selection below takes views, not copies.
+    if valid_idx[-1] - valid_idx[0] + 1 == valid_idx.size:
+        time_sel = slice(valid_idx[0], valid_idx[-1] + 1)
+    else:
+        time_sel = valid_idx
+    utc_time = utc_time[time_sel]
+    sub_orbital_tec = sub_orbital_tec[time_sel]
+
+    # Get ellipsoid object from DEM EPSG. Only the EPSG is needed from the DEM
+    # so skip opening it if the EPSG is already known. Only EPSG codes of
+    # plain local raster files are cached. GDAL virtual rasters (VRT) are not
+    # cached since their EPSG may change with the rasters they reference even
+    # if the VRT file itself is unchanged, nor are /vsi* sources which are not
+    # local files.
+    if epsg is None:
+        is_vrt = os.path.splitext(dem_path)[1].lower() == '.vrt'
+        if os.path.isfile(dem_path) and not is_vrt:
+            epsg = _epsg_for_path(*_file_cache_key(dem_path))
+        else:
+            epsg = isce3.io.Raster(dem_path).get_epsg()
+    _, ellipsoid = _proj_for_epsg(epsg)
 
     # Using zero DEM in current implementation to account for TEC file bounds
     # being larget than that of the scene DEM
@@ -142,16 +398,13 @@ def tec_lut2d_from_json(json_path: str, center_freq: float,
 
     # Compute near and far delta range for near and far TEC
     # Use radar grid start/end range for near/far range
-    # Transpose stacked output to get shape to be consistent with coordinates
+    # Output columns are near/far range to be consistent with coordinates
     rg_vec = [radar_grid.starting_range, radar_grid.end_range]
-    delta_r = np.vstack([_compute_ionospheric_range_delay(utc_time, tec_json,
-                                                          nr_fr, rg,
-                                                          center_freq, orbit,
-                                                          doppler_lut,
-                                                          radar_grid,
-                                                          dem_interp,
-                                                          ellipsoid,
-                                                          time_mask)
-                         for nr_fr, rg in zip(['Nr', 'Fr'], rg_vec)]).T
+    delta_r = np.empty((len(utc_time), len(rg_vec)), dtype=np.float64,
+                       order='C')
+    _compute_ionospheric_range_delay(utc_time, sub_orbital_tec, rg_vec,
+                                     center_freq, orbit, doppler_lut,
+                                     radar_grid, dem_interp, ellipsoid,
+                                     out=delta_r)
 
     return isce3.core.LUT2d(rg_vec, utc_time, delta_r)
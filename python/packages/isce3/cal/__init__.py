@@ -4,4 +4,4 @@ from .corner_reflector import (
     parse_triangular_trihedral_cr_csv,
     predict_triangular_trihedral_cr_rcs,
 )
-from .radar_cross_section import measure_target_rcs
+from .radar_cross_section import measure_target_rcs, measure_target_rcs_batch
@@ -4,6 +4,7 @@ Analyze a point target in a complex*8 file.
 """
 import sys
 import numpy as np
+import scipy.fft
 from warnings import warn
 
 desc = __doc__
@@ -61,7 +62,7 @@ def measure_location_from_spectrum(x):
     xy : tuple of float
         (column, row) location of target, in samples.
     """
-    X = np.fft.fft2(x)
+    X = scipy.fft.fft2(x)
     # Estimate location of target, assuming there's just one.
     tx, ty = estimate_frequency(X)
     # scale to pixels
@@ -82,23 +83,18 @@ def oversample(x, nov, baseband=False, return_slopes=False):
         fx, fy = estimate_frequency(x)
         x = shift_frequency(x, -fx, -fy)
 
-    X = np.fft.fft2(x)
-    # Zero-pad high frequencies in the spectrum.
-    Y = np.zeros((n * nov, n * nov), dtype=X.dtype)
-    n2 = n // 2
-    Y[:n2, :n2] = X[:n2, :n2]
-    Y[-n2:, -n2:] = X[-n2:, -n2:]
-    Y[:n2, -n2:] = X[:n2, -n2:]
-    Y[-n2:, :n2] = X[-n2:, :n2]
-    # Split Nyquist bins symmetrically.
     assert n % 2 == 0
-    Y[:n2, n2] = Y[:n2, -n2] = 0.5 * X[:n2, n2]
-    Y[-n2:, n2] = Y[-n2:, -n2] = 0.5 * X[-n2:, n2]
-    Y[n2, :n2] = Y[-n2, :n2] = 0.5 * X[n2, :n2]
-    Y[n2, -n2:] = Y[-n2, -n2:] = 0.5 * X[n2, -n2:]
-    Y[n2, n2] = Y[n2, -n2] = Y[-n2, n2] = Y[-n2, -n2] = 0.25 * X[n2, n2]
-    # Back to time domain.
-    y = np.fft.ifft2(Y)
+    # Zero-padding high frequencies of the 2-D spectrum is separable, so
+    # upsample one axis at a time. This way the transforms along the first
+    # axis only run over the n columns of the chip rather than all n * nov
+    # columns of the (mostly zero) padded spectrum.
+    # Use scipy.fft, which keeps single precision inputs in single precision
+    # and caches the twiddle factors of recently used transform sizes, which
+    # are the same for every chip.
+    y = x
+    for axis in (0, 1):
+        Y = _zero_pad_spectrum(scipy.fft.fft(y, axis=axis), nov, axis=axis)
+        y = scipy.fft.ifft(Y, axis=axis, overwrite_x=True)
     # NOTE account for scaling of different-sized DFTs.
     y *= nov ** 2
 
@@ -112,6 +108,22 @@ def oversample(x, nov, baseband=False, return_slopes=False):
     return y
 
 
+def _zero_pad_spectrum(X, nov, axis):
+    """
+    Zero-pad high frequencies of spectrum `X` along `axis` by a factor `nov`,
+    splitting the Nyquist bin symmetrically. Length of `axis` must be even.
+    """
+    X = np.moveaxis(X, axis, 0)
+    n = X.shape[0]
+    n2 = n // 2
+    Y = np.zeros((n * nov,) + X.shape[1:], dtype=X.dtype)
+    Y[:n2] = X[:n2]
+    Y[-n2:] = X[-n2:]
+    # Split Nyquist bins symmetrically.
+    Y[n2] = Y[-n2] = 0.5 * X[n2]
+    return np.moveaxis(Y, 0, axis)
+
+
 def estimate_resolution(x, dt=1.0):
     # Find the peak.
     y = abs(x) ** 2
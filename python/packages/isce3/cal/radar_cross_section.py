@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import warnings
-from collections.abc import Collection, Mapping
+from collections.abc import Collection, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import numpy as np
@@ -11,6 +12,11 @@ from numpy.typing import ArrayLike
 import isce3
 from isce3.cal import point_target_info
 
+# Max ratio of the area of the block of image data spanning the chips of all targets
+# to the total area of the chips for which `measure_target_rcs_batch` reads the block
+# at once rather than reading each chip separately.
+_MAX_CHIPS_BLOCK_AREA_RATIO = 4.0
+
 
 def pow2db(x: ArrayLike) -> np.ndarray:
     """Converts a power quantity from linear units to decibels (dB)."""
@@ -360,6 +366,162 @@ def measure_target_rcs(
         If the data block surrounding the target position did not contain a well-formed
         peak.
 
+    References
+    ----------
+    .. [1] R. K. Raney, T. Freeman, R. W. Hawkins, and R. Bamler, “A plea for radar
+       brightness,” Proceedings of IGARSS '94 - 1994 IEEE International Geoscience and
+       Remote Sensing Symposium.
+    """
+    return measure_target_rcs_batch(
+        target_llhs=[target_llh],
+        img_data=img_data,
+        radar_grid=radar_grid,
+        orbit=orbit,
+        doppler=doppler,
+        ellipsoid=ellipsoid,
+        nchip=nchip,
+        upsample_factor=upsample_factor,
+        peak_find_domain=peak_find_domain,
+        nfit=nfit,
+        power_method=power_method,
+        pthresh=pthresh,
+        geo2rdr_params=geo2rdr_params,
+    )[0]
+
+
+def measure_target_rcs_batch(
+    target_llhs: Iterable[isce3.core.LLH] | ArrayLike,
+    img_data: ArrayLike,
+    radar_grid: isce3.product.RadarGridParameters,
+    orbit: isce3.core.Orbit,
+    doppler: isce3.core.LUT2d,
+    ellipsoid: isce3.core.Ellipsoid = isce3.core.WGS84_ELLIPSOID,
+    *,
+    nchip: int = 64,
+    upsample_factor: int = 32,
+    peak_find_domain: str = "time",
+    nfit: int = 5,
+    power_method: str = "box",
+    pthresh: float = 3.0,
+    geo2rdr_params: Optional[Mapping[str, float]] = None,
+    max_workers: Optional[int] = None,
+) -> np.ndarray:
+    r"""
+    Estimate the radar cross-section (RCS) of multiple point-like targets using the
+    provided echo data.
+
+    This is equivalent to calling `measure_target_rcs` for each target, but the input
+    validation and setup are done once for all targets, and image data shared by
+    nearby targets is read only once. Targets are independent of one another, so
+    multiple targets are measured concurrently in a pool of threads.
+
+    Parameters
+    ----------
+    target_llhs : iterable of isce3.core.LLH or array_like
+        The target positions expressed as longitude, latitude, and height above the
+        reference ellipsoid in radians, radians, and meters respectively. Either an
+        iterable of `isce3.core.LLH` objects or an array with shape (num_targets, 3)
+        whose columns are longitude, latitude, and height.
+    img_data : array_like
+        The input radar domain (azimuth time by slant range) image data. A 2-D array
+        with shape (num_lines, num_range_bins). The image should be focused and
+        normalized such that its intensity represents :math:`\beta_0` values\ [1]_. The
+        data is assumed to be uniformly-sampled.
+    radar_grid : isce3.product.RadarGridParameters
+        The radar coordinates of the grid on which `img_data` is sampled.
+    orbit : isce3.core.Orbit
+        The trajectory of the radar antenna phase center.
+    doppler : isce3.core.LUT2d
+        The Doppler centroid, in hertz, of the image grid of the focused data, expressed
+        as a function of azimuth time, in seconds relative to the epoch of `radar_grid`,
+        and slant range, in meters. Note that this should be the Doppler associated with
+        the image grid, which may in general be different from the native Doppler of the
+        aquired echo data.
+    ellipsoid : isce3.core.Ellipsoid, optional
+        The geodetic reference ellipsoid, with dimensions in meters. Defaults to the
+        WGS 84 ellipsoid.
+    nchip : int, optional
+        The width, in pixels, of the square block of image data to extract centered
+        around the target position for oversampling and peak finding. Must be >= 1.
+        Defaults to 64.
+    upsample_factor : int, optional
+        The upsampling ratio. Must be >= 1. Defaults to 32.
+    peak_find_domain : {'time', 'freq'}, optional
+        Option controlling how the target peak position is estimated.
+
+        'time':
+          The default mode. The peak location is found in the time domain by detecting
+          the maximum value within a square block of image data around the expected
+          target location. The signal data is upsampled to improve precision.
+
+        'freq':
+          The peak location is found by estimating the phase ramp in the frequency
+          domain. This mode is useful when target is well-focused, has high SNR, and is
+          the only target in the neighborhood (often the case in point target
+          simulations).
+    nfit : int, optional
+        The width, in *oversampled* pixels, of the square sub-block of image data
+        (centered around the target position) to extract for fitting a quadratic
+        polynomial to the peak. Note that this is the size in pixels *after upsampling*.
+        Must be >= 3. Defaults to 5.
+    power_method : {'box', 'integrated'}, optional
+        The method for estimating the target signal power.
+
+        'box':
+          The default mode. Measures power using the rectangular box method, which
+          assumes that the target response can be approximated by a 2-D rectangular
+          function. The total power is estimated by multiplying the peak power by the
+          3dB response widths in along-track and cross-track directions.
+
+        'integrated':
+          Measures power using the integrated power method. The total power is measured
+          by summing the power of bins whose power exceeds a predefined minimum power
+          threshold.
+    pthresh : float, optional
+        The minimum power threshold, measured in dB below the peak power, for estimating
+        the target signal power using the integrated power method. This parameter is
+        ignored if `power_method` is not 'integrated'. Defaults to 3.
+    geo2rdr_params : dict or None, optional
+        An optional dict of parameters configuring the behavior of the root-finding
+        routine used in geo2rdr. The following keys are supported:
+
+        'threshold':
+          The absolute azimuth time convergence tolerance, in seconds.
+
+        'maxiter':
+          The maximum number of Newton-Raphson iterations.
+
+        'delta_range':
+          The step size for computing numerical gradient of Doppler, in meters.
+    max_workers : int or None, optional
+        The maximum number of threads used to measure targets concurrently. If None,
+        the default of `concurrent.futures.ThreadPoolExecutor` is used. If 1, or if
+        there is only a single target, targets are measured in the calling thread.
+        Defaults to None.
+
+    Returns
+    -------
+    sigma : numpy.ndarray
+        The measured radar cross-section of each target, in meters squared (linear
+        scale -- not dB). A 1-D float64 array with shape (num_targets,), in the same
+        order as `target_llhs` (regardless of the order in which targets are
+        processed).
+
+    Raises
+    ------
+    ValueError
+        If the shape of `img_data` does not match `radar_grid`, if any of `nchip`,
+        `upsample_factor`, or `nfit` is out of range, or if `peak_find_domain` or
+        `power_method` is not one of the supported values.
+    RuntimeError
+        If any target position was outside of the image grid or too near the border.
+        The geometry of all targets is checked before any image data is read, so a
+        single out-of-swath target fails the whole batch and no partial results are
+        returned. Use `measure_target_rcs` per target to skip such targets instead.
+    RuntimeError
+        If the data block surrounding any target position did not contain a
+        well-formed peak.
+
     References
     ----------
     .. [1] R. K. Raney, T. Freeman, R. W. Hawkins, and R. Bamler, “A plea for radar
@@ -396,12 +558,109 @@ def measure_target_rcs(
             RuntimeWarning,
         )
 
-    # Convert LLH object to an array containing [lon, lat, height].
-    target_llh = target_llh.to_vec3()
+    # Convert LLH objects to an array of [lon, lat, height] per target.
+    target_llhs = np.asarray(
+        [
+            llh.to_vec3() if isinstance(llh, isce3.core.LLH) else llh
+            for llh in target_llhs
+        ],
+        dtype=np.float64,
+    ).reshape(-1, 3)
 
     if geo2rdr_params is None:
         geo2rdr_params = {}
 
+    # Get the (aztime,srange) radar coordinates of all targets.
+    radar_coords = np.empty((len(target_llhs), 2), dtype=np.float64)
+    for k, target_llh in enumerate(target_llhs):
+        radar_coords[k] = _get_target_radar_coords(
+            target_llh, radar_grid, orbit, doppler, ellipsoid, nchip, geo2rdr_params
+        )
+
+    # Convert target positions (aztime,srange) coordinates to integer (row,col) pixel
+    # coordinates within the radar grid, and get the pixel coordinates of the first
+    # sample of the chip of image data centered around each target.
+    aztimes, sranges = radar_coords.T
+    rows = ((aztimes - radar_grid.sensing_start) * radar_grid.prf).astype(int)
+    cols = (
+        (sranges - radar_grid.starting_range) / radar_grid.range_pixel_spacing
+    ).astype(int)
+    chip_rows = rows - nchip // 2 + 1
+    chip_cols = cols - nchip // 2 + 1
+
+    # Read the block of image data spanning all chips at once if the chips densely
+    # cover it. Otherwise (e.g. if a few targets are far apart), read each chip
+    # separately so that only the data near each target is read and decoded.
+    img_block = img_data
+    row_offset = col_offset = 0
+    if len(target_llhs) > 1:
+        row_offset, col_offset = chip_rows.min(), chip_cols.min()
+        block_shape = (
+            chip_rows.max() + nchip - row_offset,
+            chip_cols.max() + nchip - col_offset,
+        )
+        chips_area = len(target_llhs) * nchip**2
+        if np.prod(block_shape) <= _MAX_CHIPS_BLOCK_AREA_RATIO * chips_area:
+            img_block = img_data[
+                row_offset : row_offset + block_shape[0],
+                col_offset : col_offset + block_shape[1],
+            ]
+        else:
+            row_offset = col_offset = 0
+
+    def measure_rcs(k: int) -> float:
+        # Extract a small square block of image data centered around the expected
+        # target location.
+        _, _, chip = point_target_info.get_chip(
+            img_block, rows[k] - row_offset, cols[k] - col_offset, nchip=nchip
+        )
+
+        return _measure_chip_rcs(
+            chip,
+            target_llhs[k],
+            aztimes[k],
+            radar_grid,
+            orbit,
+            ellipsoid,
+            upsample_factor=upsample_factor,
+            peak_find_domain=peak_find_domain,
+            nfit=nfit,
+            power_method=power_method,
+            pthresh=pthresh,
+        )
+
+    # Dispatch targets in order of increasing azimuth time so that chips read
+    # separately tend to hit the same HDF5 chunks in the chunk cache. The FFTs &
+    # geometry routines used to measure each target release the GIL, so multiple
+    # targets are processed in parallel by a pool of threads.
+    order = np.argsort(aztimes, kind="stable")
+    sigma = np.empty(len(target_llhs), dtype=np.float64)
+    if (len(order) == 1) or (max_workers == 1):
+        sigma[order] = np.fromiter(
+            map(measure_rcs, order), dtype=np.float64, count=len(order)
+        )
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sigma[order] = np.fromiter(
+                executor.map(measure_rcs, order), dtype=np.float64, count=len(order)
+            )
+
+    return sigma
+
+
+def _get_target_radar_coords(
+    target_llh: np.ndarray,
+    radar_grid: isce3.product.RadarGridParameters,
+    orbit: isce3.core.Orbit,
+    doppler: isce3.core.LUT2d,
+    ellipsoid: isce3.core.Ellipsoid,
+    nchip: int,
+    geo2rdr_params: Mapping[str, float],
+) -> tuple[float, float]:
+    """
+    Get the (azimuth time, slant range) radar coordinates of a target, checking that
+    a chip of image data may be extracted around it.
+    """
     wavelength = radar_grid.wavelength
     look_side = radar_grid.lookside
 
@@ -441,15 +700,33 @@ def measure_target_rcs(
             "target is too close to image border -- consider reducing nchip"
         )
 
-    # Extract a small square block of image data centered around the expected target
-    # location.
-    _, _, chip = point_target_info.get_chip(img_data, i, j, nchip=nchip)
+    return aztime, srange
+
 
+def _measure_chip_rcs(
+    chip: np.ndarray,
+    target_llh: np.ndarray,
+    aztime: float,
+    radar_grid: isce3.product.RadarGridParameters,
+    orbit: isce3.core.Orbit,
+    ellipsoid: isce3.core.Ellipsoid,
+    *,
+    upsample_factor: int,
+    peak_find_domain: str,
+    nfit: int,
+    power_method: str,
+    pthresh: float,
+) -> float:
+    """
+    Measure the RCS of a single target given a square block of image data centered
+    around it and its azimuth time.
+    """
     # Upsample.
     chip_ups = point_target_info.oversample(chip, nov=upsample_factor)
 
-    # Get chip power in linear and dB.
-    chip_ups_pwr = np.abs(chip_ups) ** 2
+    # Get chip power in linear and dB. Power is computed from the real and imaginary
+    # parts directly to avoid the square root of `abs()`.
+    chip_ups_pwr = chip_ups.real ** 2 + chip_ups.imag ** 2
     chip_ups_pwr_db = pow2db(chip_ups_pwr)
 
     # Estimate the peak position within the upsampled chip, in pixel coordinates.
@@ -185,7 +185,7 @@ def sign_doppler_est(echo, prf, lag=1, axis=None):
 
 
 def wavelen_diversity_doppler_est(echo, prf, samprate, bandwidth,
-                                  centerfreq):
+                                  centerfreq, workers=None):
     """Estimate Doppler based on wavelength diversity.
 
     It uses slope of phase of range frequency along with single-lag
@@ -203,6 +203,9 @@ def wavelen_diversity_doppler_est(echo, prf, samprate, bandwidth,
         RF/chirp bandiwdth in (Hz)
     centerfreq : float
         RF center frequency of chirp in (Hz)
+    workers : int, optional
+        Maximum number of workers used in range FFT. See `scipy.fft.fft`.
+        Default is None, that is the scipy default.
 
     Returns
     -------
@@ -248,7 +251,7 @@ def wavelen_diversity_doppler_est(echo, prf, samprate, bandwidth,
 
     # FFT along range
     nfft = fft.next_fast_len(num_rgb)
-    echo_fft = fft.fft(echo, nfft, axis=1)
+    echo_fft = fft.fft(echo, nfft, axis=1, workers=workers)
 
     # one-lag correlator along azimuth
     az_corr = (echo_fft[1:] * echo_fft[:-1].conj()).mean(axis=0)
@@ -66,16 +66,24 @@ class SLC(Base, family='nisar.productreader.slc'):
                 return f"{g.name}/SLC"
         raise RuntimeError("HDF5 file missing 'RSLC' or 'SLC' product group.")
 
-    def getSlcDataset(self, frequency, polarization):
+    def getSlcDataset(self, frequency, polarization, rdcc_nbytes=None,
+                      rdcc_nslots=None, rdcc_w0=None):
         '''
         Return SLC dataset of given frequency and polarization from hdf5 file
+
+        The optional `rdcc_nbytes`, `rdcc_nslots` and `rdcc_w0` set the raw
+        data chunk cache of the file as in `h5py.File`, e.g. to keep decoded
+        chunks in memory across many small reads. If None, the HDF5 defaults
+        are used.
         '''
 
         # TODO add checks for (1) file open error (2) path check
         slcDataset = None
 
         # open H5 with swmr mode enabled
-        fid = h5py.File(self.filename, 'r', libver='latest', swmr=True)
+        fid = h5py.File(self.filename, 'r', libver='latest', swmr=True,
+                        rdcc_nbytes=rdcc_nbytes, rdcc_nslots=rdcc_nslots,
+                        rdcc_w0=rdcc_w0)
 
         # build path the desired dataset
         ds_path = self.slcPath(frequency, polarization)
@@ -1,21 +1,39 @@
 """
 Function to generate Doppler LUT2d from Raw L0B data.
 """
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
 import logging
 import os
+import h5py
 import numpy as np
+from numpy.polynomial.polynomial import polyvander
 from scipy import fft
 try:
     from matplotlib import pyplot as plt
 except ImportError:
     plt = None
 
-from isce3.signal import (cheby_equi_ripple_filter, corr_doppler_est,
-                          sign_doppler_est, unwrap_doppler)
+from isce3.signal import cheby_equi_ripple_filter, unwrap_doppler
 from isce3.core import LUT2d, speed_of_light
 from isce3.antenna import Frame
 from isce3.geometry import DEMInterpolator
 from isce3.signal import form_single_tap_dbf_echo
+from nisar.products.readers.Raw import DataDecoder
+
+# Approximate size in bytes of the working set, echo spectrum plus the
+# filtered spectra of three subbands, per tile of range lines used in subband
+# filtering of echo. It is meant to be in the order of a CPU L3 cache.
+_SUBBAND_TILE_NBYTES = 16 * 1024**2
+# Absolute tolerance of echo magnitude below which the sample is zero
+_ECHO_ZERO_ATOL = 1e-8
+# Upper bound in bytes of the HDF5 chunk cache of the raw dataset
+_MAX_RAW_CHUNK_CACHE_NBYTES = 256 * 1024**2
+# Approximate size in bytes of a tile of range lines of echo over which
+# lag-one correlations are accumulated in time-domain Doppler estimators.
+# It bounds the size of temporaries regardless of azimuth block size.
+_DOP_EST_TILE_NBYTES = 16 * 1024**2
 
 
 def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
@@ -280,9 +298,21 @@ def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
         logger.info("Perform sub-banding on echo data!")
         logger.info(f'Number of subbands -> {num_subband}')
         bw_flt = bandwidth / num_subband
-        coeff_lpf = cheby_equi_ripple_filter(samprate, bw_flt, rolloff_flt,
-                                             ripple_flt, stopatt_flt,
-                                             force_odd_len=True)
+
+        # Calculate center frequencies for only three bands:first, mid,and last
+        fcnt_first = (1 - num_subband) / (2. * num_subband) * bandwidth
+        fcnt_last = -fcnt_first
+        fcnt_subbands = [fcnt_first, 0.0, fcnt_last]
+        fcnt_rf_subbands = np.asarray(fcnt_subbands) + centerfreq
+
+        # Get prototype LPF and freq-domain filter coeffs of all three bands.
+        # These are cached and reused among calls with the same parameters.
+        (coeff_lpf, nfft, coeff_lpf_fft, coef_bpf_fft_first,
+         coef_bpf_fft_last) = _design_subband_filters(
+            samprate, bw_flt, rolloff_flt, ripple_flt, stopatt_flt,
+            fcnt_first, tot_rgbs)
+        # return a copy of the prototype LPF so the cached one is untouched
+        coeff_lpf = coeff_lpf.copy()
         len_flt = len(coeff_lpf)
         logger.info(
             'Subbanding filter passband bandiwdth -> '
@@ -295,38 +325,29 @@ def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
         logger.info(f'Subbanding filter rolloff factor -> {rolloff_flt}')
         logger.info(f'Length of subband filter -> {len_flt}')
 
-        # convolution length and group delay
-        len_conv = tot_rgbs + len_flt - 1
+        # group delay of the filter
         grp_del = len_flt // 2
-
-        # Get number of FFT and total group delay caused by rgcomp + subband
-        nfft = fft.next_fast_len(len_conv)
         logger.info(
             f'Number of FFT points in rangecomp and/or subbanding -> {nfft}')
-
-        # Get FFT of the prototype LPF
-        coeff_lpf_fft = fft.fft(coeff_lpf, nfft)
         slice_grp_del = slice(grp_del, grp_del + tot_rgbs)
 
-        # Calculate center frequencies for only three bands:first, mid,and last
-        fcnt_first = (1 - num_subband) / (2. * num_subband) * bandwidth
-        fcnt_last = -fcnt_first
-        fcnt_subbands = [fcnt_first, 0.0, fcnt_last]
-        fcnt_rf_subbands = np.asarray(fcnt_subbands) + centerfreq
+        # stack spectra of all three bands (first, mid, last) so that all
+        # of them are applied to a single forward FFT of the echo
+        coef_bands_fft = np.stack(
+            [coef_bpf_fft_first, coeff_lpf_fft, coef_bpf_fft_last])
+
+        # Linear (1st degree) polyfit of Doppler over three bands evaluated
+        # at the center freq of the chirp is a fixed weighted sum of the
+        # three Dopplers. The weights are the intercept row of pseudo-inverse
+        # of Vandermonde matrix of RF freqs relative to the center freq.
+        wgt_subbands = np.linalg.pinv(
+            polyvander(fcnt_rf_subbands - centerfreq, 1))[0]
+
         logger.info(
             'The RF center freq of subbands -> '
             '({:.2f}, {:.2f}, {:.2f}) (MHz)'.format(*(fcnt_rf_subbands * 1e-6))
         )
 
-        # Mixer func for up/down conversion of LPF -> BPF
-        def mixer_fun(fc):
-            return np.exp(
-                1j * 2.0 * np.pi * fc / samprate * np.arange(len_flt))
-
-        # Get freq-domain BPFs Coeffs for two edge bands from LPF prototype
-        coef_bpf_fft_first = fft.fft(coeff_lpf * mixer_fun(fcnt_first), nfft)
-        coef_bpf_fft_last = fft.fft(coeff_lpf * mixer_fun(fcnt_last), nfft)
-
         # plot three suband BPF in frequency domain
         if plot:
             plt_name = f'Subband_Filter_Plot_Freq{freq_band}_Pol{txrx_pol}.png'
@@ -339,11 +360,11 @@ def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
     logger.info(
         f'Doppler estimator method per block and per band -> {dop_method}')
     # form a generic doppler estimator function covering both methods
+    # and operating on all range blocks at once
     if dop_method == 'SDE':
-        def time_dop_est(echo, prf, lag=1, axis=None):
-            return sign_doppler_est(echo, prf, lag, axis), 1
+        time_dop_est = _sign_doppler_est_blocks
     elif dop_method == 'CDE':
-        time_dop_est = corr_doppler_est
+        time_dop_est = _corr_doppler_est_blocks
     else:
         raise ValueError(
             f'Unexpected time-domain Doppler method "{dop_method}"')
@@ -398,6 +419,19 @@ def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
     sr_stop = sr_start + (num_blk_rg - 1) * sr_spacing
     slrg_per_blk = np.linspace(sr_start, sr_stop, num=num_blk_rg)
 
+    # Vandermonde matrix of slant ranges used in polyfit of Doppler over
+    # ranges. Slant ranges are centered and scaled to [-1, 1] for numerical
+    # stability.
+    if polyfit:
+        sr_half = max(0.5 * (sr_stop - sr_start), sr_spacing)
+        vander_rg = polyvander(
+            (slrg_per_blk - 0.5 * (sr_start + sr_stop)) / sr_half,
+            polyfit_deg)
+        # mask of valid range blocks and pseudo-inverse of their Vandermonde
+        # matrix that is reused among azimuth blocks with the same mask
+        mask_pinv = None
+        pinv_vander = None
+
     # form the blocks of range lines / azimuth bins
     len_az_blk_dur, len_tm_int, num_blk_az = _get_az_block_interval_len(
         tot_pulses, az_block_dur, prf, time_interval)
@@ -414,47 +448,55 @@ def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
     )
     logger.info(f'Total number of azimuth blocks -> {num_blk_az}')
 
-    slice_lines = _azblk_slice_gen(
+    # Reopen raw dataset with an HDF5 chunk cache enlarged (within a bound)
+    # to hold the chunks of both current and prefetched azimuth blocks so
+    # that chunks shared by overlapping blocks are not read and decompressed
+    # twice. The decoder object of the caller is left untouched.
+    raw_dset = _with_raw_chunk_cache(raw_dset, 2 * len_az_blk_dur)
+
+    # (start, stop) range line indices of all azimuth blocks
+    azblk_bounds = _azblk_start_stop(
         tot_pulses, len_az_blk_dur, len_tm_int, num_blk_az)
 
     # parse valid subswath index for all range lines used later
     valid_sbsw_all = raw.getSubSwaths(freq_band, txrx_pol[0])
-    # initialized output mask array for averaged range bins for
-    # all azimuth blocks
-    mask_rgb_avg_all = np.zeros((num_blk_az, num_blk_rg), dtype='bool')
+    # output mask array for averaged range bins for all azimuth blocks.
+    # All outputs per azimuth block are fully set within the loop.
+    mask_rgb_avg_all = np.empty((num_blk_az, num_blk_rg), dtype='bool')
 
-    # initialize correlator coeff for all range bins and azimuth blocks
-    corr_coef = np.ones((num_blk_az, num_blk_rg), dtype='float32')
+    # correlator coeff for all range bins and azimuth blocks
+    corr_coef = np.empty((num_blk_az, num_blk_rg), dtype='float32')
 
-    # initialize the azimuth time block and set an intermediate var
+    # initialize the azimuth time at mid part of all azimuth blocks
     half_az_blk_dur = (len_az_blk_dur - 1) / 2
-    az_time_blk = np.full(num_blk_az, az_time[0] + half_az_blk_dur * pri,
-                          dtype=float)
-    tm_int_pri_prod = len_tm_int * pri
+    az_time_blk = az_time[0] + half_az_blk_dur * pri + \
+        np.arange(num_blk_az) * (len_tm_int * pri)
 
     # doppler centroid map is azimuth block by slant-range block
-    dop_cnt_map = np.zeros((num_blk_az, num_blk_rg), dtype='float32')
-
-    # loop over azimuth blocks /range line blocks
-    for n_azblk, slice_line in enumerate(slice_lines):
-        num_lines = slice_line.stop - slice_line.start
-        logger.info(
-            f'(start, stop) of AZ block # {n_azblk + 1} -> '
-            f'{slice_line.start, slice_line.stop}'
-        )
-        logger.info(
-            'Block size (lines, ranges) for Doppler estimation -> '
-            f'({num_lines, num_rgb_avg})'
-        )
-        # azimuth time at mid part of the azimuth block
-        az_time_blk[n_azblk] += n_azblk * tm_int_pri_prod
+    dop_cnt_map = np.empty((num_blk_az, num_blk_rg), dtype='float32')
 
+    # scratch buffers reused among azimuth blocks for the filtered echoes
+    # and spectra of all three subbands
+    if subband:
+        echo_bands_buf = np.empty((3, len_az_blk_dur, tot_rgbs),
+                                  dtype=np.complex64)
+        # number of range lines per tile so that the echo spectrum and
+        # three filtered spectra of a tile stay in cache
+        num_lines_tile = max(
+            1, _SUBBAND_TILE_NBYTES // (4 * nfft * np.complex64().itemsize))
+        num_lines_tile = min(num_lines_tile, len_az_blk_dur)
+        spec_bands_buf = np.empty((3, num_lines_tile, nfft),
+                                  dtype=np.complex64)
+
+    def read_echo_block(n_azblk):
+        """Get decoded raw echoes of one azimuth block and for all range bins
+        along with spacecraft attitude and velocity at its mid time"""
+        slice_line = slice(*azblk_bounds[n_azblk].tolist())
         # compute position, velocity and quaternion of the spacecraft at
         # mid time of the azimuth block
         quat_mid = attitude.interpolate(az_time_blk[n_azblk])
         pos_mid, vel_mid = orbit.interpolate(az_time_blk[n_azblk])
 
-        # get decoded raw echoes of one azimuth block and for all range bins
         if is_multi_chanl:
             echo = form_single_tap_dbf_echo(raw_dset, slice_line,
                                             el_trans, az_trans,
@@ -462,141 +504,158 @@ def doppler_lut_from_raw(raw, freq_band='A', txrx_pol=None,
                                             sr_lsp, dem)
         else:  # single channel
             echo = raw_dset[slice_line]
-
-        # create a mask for invalid/bad range bins for any reason
-        # invalid values are either nan or zero but this does not include
-        # TX gaps that may be filled with TX chirp!
-        mask_bad = (np.isnan(echo) | np.isclose(echo, 0)).sum(axis=0) > 0
-
-        # build a mask array of range bins assuming fixed PRF within
-        # each azimuth block. This is needed in case the TX gaps are filled
-        # with TX chirp rather than invalid/bad value!
-        mask_valid_rgb = _form_mask_valid_range(
-            tot_rgbs, valid_sbsw_all[:, slice_line.start, :])
-        mask_valid_rgb &= _form_mask_valid_range(
-            tot_rgbs, valid_sbsw_all[:, slice_line.stop - 1, :])
-
-        # Update valid mask with invalid range bins over all range lines
-        mask_valid_rgb[mask_bad] = False
-
-        # decimate the range bins mask to fill in mask for averaged range bins
-        # per azimuth block. Make sure a valid averaged block contains all
-        # valid range bins otherwise set to invalid.
-        mask_rgb_avg_all[n_azblk] = mask_valid_rgb[
-            :num_blk_rg * num_rgb_avg].reshape((num_blk_rg, num_rgb_avg)).sum(
-                axis=1) == num_rgb_avg
-
-        # form mask for NaN values in echo and replace it with 0
-        echo[np.isnan(echo)] = 0.0
-
-        if subband:
-            echo_sub_first = np.zeros(echo.shape, dtype=echo.dtype)
-            echo_sub_last = np.copy(echo_sub_first)
-            # Loop over range lines for one azimuth block
-            for line in range(num_lines):
-                # apply subband BPF in freq domain
-                rgc_line_fft = fft.fft(echo[line], nfft)
-                # first band
-                rgc_line_fft_edge = rgc_line_fft * coef_bpf_fft_first
-                echo_sub_first[line] = fft.ifft(
-                    rgc_line_fft_edge)[slice_grp_del]
-                # last band
-                rgc_line_fft_edge = rgc_line_fft * coef_bpf_fft_last
-                echo_sub_last[line] = fft.ifft(
-                    rgc_line_fft_edge)[slice_grp_del]
-                # mid band
-                rgc_line_fft *= coeff_lpf_fft
-                # go back to time and get rid of all group delays
-                echo[line] = fft.ifft(rgc_line_fft)[slice_grp_del]
-
-        # estimate doppler per band, per azimuth block over all range blocks
-        dop_cnt = np.zeros(num_blk_rg, dtype="float32")
-        for n_blk in range(num_blk_rg):
-            slice_rgb = slice(n_blk * num_rgb_avg, (n_blk + 1) * num_rgb_avg)
-            # CDE or SDE
-            dop_cnt[n_blk], corr_coef[n_azblk, n_blk] = time_dop_est(
-                echo[:, slice_rgb], prf)
-
-        if subband:
-            dop_cnt_bands = np.zeros((3, num_blk_rg), dtype="float32")
-            dop_cnt_bands[1] = dop_cnt
-            for n_blk in range(num_blk_rg):
-                slice_rgb = slice(n_blk * num_rgb_avg,
-                                  (n_blk + 1) * num_rgb_avg)
-                # CDE or SDE for each subband
-                dop_cnt_bands[0, n_blk], corr_coef_low = time_dop_est(
-                    echo_sub_first[:, slice_rgb], prf)
-                dop_cnt_bands[-1, n_blk], corr_coef_high = time_dop_est(
-                    echo_sub_last[:, slice_rgb], prf)
-                # sum correlation coeff among all three bands
-                corr_coef[n_azblk, n_blk] += (corr_coef_low + corr_coef_high)
-            # average correlation coeff among all three bands
-            corr_coef[n_azblk] /= 3.0
-
-            # perform doppler unwrapping over three bands
-            dop_cnt_bands = unwrap_doppler(dop_cnt_bands, prf)
-
-            # perform linear (1st degree) polyfit over 3 bands for
-            # all range blocks
-            # IF version: np.polyfit(fcnt_subbands, dop_cnt_bands, 1)
-            pf_coef_subbands = np.polyfit(fcnt_rf_subbands, dop_cnt_bands, 1)
-
-            # eval doppler centroid at the center freq of the chirp
-            # IF version: pf_coef_subbands[1]
-            dop_cnt = np.polyval(pf_coef_subbands, centerfreq)
-
-        # get valid dopplers in range
-        dop_cnt_valid = dop_cnt[mask_rgb_avg_all[n_azblk]]
-
-        # Unwrap only valid Doppler values along range
-        dop_cnt_valid = unwrap_doppler(dop_cnt_valid, prf)
-
-        # Polyfit valid-only doppler centroids over slant ranges
-        if polyfit:  # replace actual value by polyfitted ones
-            sr_valid = slrg_per_blk[mask_rgb_avg_all[n_azblk]]
-            # check if the number of valid range blocks > polyfit_deg
-            if sr_valid.size <= polyfit_deg:
-                raise RuntimeError(
-                    'Too many bad range bins! Polyfit requires at least '
-                    f'{polyfit_deg + 1} valid range blocks or '
-                    f'{(polyfit_deg + 1) * num_rgb_avg} valid range bins!'
-                )
-            pf_coef_dop_cnt = np.polyfit(sr_valid, dop_cnt_valid, polyfit_deg)
-            dop_cnt_map[n_azblk] = np.polyval(pf_coef_dop_cnt, slrg_per_blk)
-            # given estimation of invalid range bins from polyfit,
-            # set the mask to be all True after polyeval!
-            mask_rgb_avg_all[n_azblk] = True
-        else:  # keep the actual values
-            # store the valid Dopplers unwrapped over ranges
-            dop_cnt[mask_rgb_avg_all[n_azblk]] = dop_cnt_valid
-            dop_cnt_map[n_azblk] = dop_cnt
-
-        # plot ambiguous Doppler centroid purely extracted from echo
-        # per azimuth block
-        if plot:
-            _plot_save_dop(n_azblk, slrg_per_blk, dop_cnt,
-                           az_time_blk[n_azblk], epoch_utc_str, out_path,
-                           freq_band, txrx_pol, polyfit_deg,
-                           mask_rgb_avg_all[n_azblk])
-
-        # calculate absolute doppler and its ambiguity number to be added
-        # to estimated ambiguous doppler centroid for final LUT2d
-        # Use median (or mean) of measured ambiguous doppler over slant ranges
-        # obatained from echo to be used in doppler ambiguity calculation.
-        # Perhaps Median is more suited in case of skewed Doppler outliers
-        # due to presence of man-made or non-homogenous targets in homogenous
-        # scene.
-        dop_echo = np.median(dop_cnt_valid)
-        dop_abs, dop_amb_num = _compute_doppler_abs_ambiguity(
-            vel_mid, quat_mid, look_vec_ant, prf, wavelength, dop_echo)
-
-        logger.info('Absolute Doppler calculated from attitude for block # '
-                    f'{n_azblk + 1} -> {dop_abs:.1f} (Hz)')
-        logger.info('Calculated Doppler ambiguity number from attitude '
-                    f'for block # {n_azblk + 1} -> {dop_amb_num}')
-        # Adjust estimated Doppler centroids if doppler ambiguity is non zero.
-        if dop_amb_num:
-            dop_cnt_map[n_azblk] += dop_amb_num * prf
+        # keep echo in single precision so that all FFTs and filtering
+        # stay in single precision. No copy if it is already complex64.
+        echo = np.asarray(echo, dtype=np.complex64)
+        return echo, quat_mid, vel_mid
+
+    # loop over azimuth blocks /range line blocks while the echo of the next
+    # azimuth block is read in the background. The prefetch generator is
+    # closed on exit, even on error, to shut down its background thread.
+    with contextlib.closing(
+            _prefetch_gen(read_echo_block, range(num_blk_az))
+    ) as echo_blocks:
+        for n_azblk, (echo, quat_mid, vel_mid) in enumerate(echo_blocks):
+            i_start, i_stop = azblk_bounds[n_azblk].tolist()
+            num_lines = i_stop - i_start
+            logger.info(
+                f'(start, stop) of AZ block # {n_azblk + 1} -> '
+                f'{i_start, i_stop}'
+            )
+            logger.info(
+                'Block size (lines, ranges) for Doppler estimation -> '
+                f'({num_lines, num_rgb_avg})'
+            )
+
+            # create a mask for invalid/bad range bins for any reason
+            # invalid values are either nan or zero but this does not include
+            # TX gaps that may be filled with TX chirp!
+            # Both are caught by a single comparison of the magnitude since any
+            # comparison with NaN is False.
+            mask_bad = ~(np.abs(echo) > _ECHO_ZERO_ATOL).all(axis=0)
+
+            # build a mask array of range bins assuming fixed PRF within
+            # each azimuth block. This is needed in case the TX gaps are filled
+            # with TX chirp rather than invalid/bad value!
+            mask_valid_rgb = _form_mask_valid_range(
+                tot_rgbs, valid_sbsw_all[:, i_start, :])
+            mask_valid_rgb &= _form_mask_valid_range(
+                tot_rgbs, valid_sbsw_all[:, i_stop - 1, :])
+
+            # Update valid mask with invalid range bins over all range lines
+            mask_valid_rgb[mask_bad] = False
+
+            # decimate the range bins mask to fill in mask for averaged range
+            # bins per azimuth block. Make sure a valid averaged block contains
+            # all valid range bins otherwise set to invalid.
+            mask_rgb_avg_all[n_azblk] = mask_valid_rgb[
+                :num_blk_rg * num_rgb_avg].reshape(
+                    (num_blk_rg, num_rgb_avg)).all(axis=1)
+
+            # zero non-finite (NaN or inf in either I or Q) samples of echo in
+            # place. This is only needed if there is any bad range bin.
+            if mask_bad.any():
+                echo[~np.isfinite(echo)] = 0
+
+            if subband:
+                # apply all three subband filters in freq domain to the range
+                # lines of one azimuth block sharing one forward FFT per line.
+                # Range lines are processed in tiles whose spectra fit in
+                # cache so that each tile's spectrum is reused from cache by
+                # all three filters and inverse FFTs.
+                echo_bands = echo_bands_buf[:, :num_lines]
+                for i_line in range(0, num_lines, num_lines_tile):
+                    slice_tile = slice(i_line, i_line + num_lines_tile)
+                    echo_fft = fft.fft(echo[slice_tile], nfft, axis=1,
+                                       workers=-1)
+                    spec_bands = spec_bands_buf[:, :echo_fft.shape[0]]
+                    np.multiply(echo_fft, coef_bands_fft[:, np.newaxis],
+                                out=spec_bands)
+                    # go back to time and get rid of all group delays.
+                    # The spectra are scratch and can be overwritten.
+                    echo_bands[:, slice_tile] = fft.ifft(
+                        spec_bands, axis=-1, workers=-1,
+                        overwrite_x=True)[..., slice_grp_del]
+
+                # estimate doppler of all three bands (first, mid, last) per
+                # azimuth block over all range blocks at once, CDE or SDE
+                dop_cnt_bands, corr_coef_bands = time_dop_est(
+                    echo_bands, prf, num_rgb_avg)
+                # average correlation coeff among all three bands
+                corr_coef_low, corr_coef_mid, corr_coef_high = corr_coef_bands
+                corr_coef[n_azblk] = (corr_coef_low + corr_coef_mid +
+                                      corr_coef_high) * (1.0 / 3.0)
+
+                # perform doppler unwrapping over three bands
+                dop_cnt_bands = unwrap_doppler(dop_cnt_bands, prf)
+
+                # perform linear (1st degree) polyfit over 3 bands for
+                # all range blocks and eval doppler centroid at the center freq
+                # of the chirp
+                dop_cnt = wgt_subbands @ dop_cnt_bands
+            else:
+                # estimate doppler per azimuth block over all range blocks
+                # CDE or SDE
+                dop_cnt, corr_coef[n_azblk] = time_dop_est(
+                    echo, prf, num_rgb_avg)
+
+            # get valid dopplers in range
+            dop_cnt_valid = dop_cnt[mask_rgb_avg_all[n_azblk]]
+
+            # Unwrap only valid Doppler values along range
+            dop_cnt_valid = unwrap_doppler(dop_cnt_valid, prf)
+
+            # Polyfit valid-only doppler centroids over slant ranges
+            if polyfit:  # replace actual value by polyfitted ones
+                sr_valid = slrg_per_blk[mask_rgb_avg_all[n_azblk]]
+                # check if the number of valid range blocks > polyfit_deg
+                if sr_valid.size <= polyfit_deg:
+                    raise RuntimeError(
+                        'Too many bad range bins! Polyfit requires at least '
+                        f'{polyfit_deg + 1} valid range blocks or '
+                        f'{(polyfit_deg + 1) * num_rgb_avg} valid range bins!'
+                    )
+                if (mask_pinv is None or not np.array_equal(
+                        mask_pinv, mask_rgb_avg_all[n_azblk])):
+                    mask_pinv = mask_rgb_avg_all[n_azblk].copy()
+                    pinv_vander = np.linalg.pinv(vander_rg[mask_pinv])
+                pf_coef_dop_cnt = pinv_vander @ dop_cnt_valid
+                dop_cnt_map[n_azblk] = vander_rg @ pf_coef_dop_cnt
+                # given estimation of invalid range bins from polyfit,
+                # set the mask to be all True after polyeval!
+                mask_rgb_avg_all[n_azblk] = True
+            else:  # keep the actual values
+                # store the valid Dopplers unwrapped over ranges
+                dop_cnt[mask_rgb_avg_all[n_azblk]] = dop_cnt_valid
+                dop_cnt_map[n_azblk] = dop_cnt
+
+            # plot ambiguous Doppler centroid purely extracted from echo
+            # per azimuth block
+            if plot:
+                _plot_save_dop(n_azblk, slrg_per_blk, dop_cnt,
+                               az_time_blk[n_azblk], epoch_utc_str, out_path,
+                               freq_band, txrx_pol, polyfit_deg,
+                               mask_rgb_avg_all[n_azblk])
+
+            # calculate absolute doppler and its ambiguity number to be added
+            # to estimated ambiguous doppler centroid for final LUT2d
+            # Use median (or mean) of measured ambiguous doppler over slant
+            # ranges obatained from echo to be used in doppler ambiguity
+            # calculation. Perhaps Median is more suited in case of skewed
+            # Doppler outliers due to presence of man-made or non-homogenous
+            # targets in homogenous scene.
+            dop_echo = np.median(dop_cnt_valid)
+            dop_abs, dop_amb_num = _compute_doppler_abs_ambiguity(
+                vel_mid, quat_mid, look_vec_ant, prf, wavelength, dop_echo)
+
+            logger.info('Absolute Doppler calculated from attitude for '
+                        f'block # {n_azblk + 1} -> {dop_abs:.1f} (Hz)')
+            logger.info('Calculated Doppler ambiguity number from attitude '
+                        f'for block # {n_azblk + 1} -> {dop_amb_num}')
+            # Adjust estimated Doppler centroids if doppler ambiguity is non
+            # zero.
+            if dop_amb_num:
+                dop_cnt_map[n_azblk] += dop_amb_num * prf
 
     # form Doppler LUT2d object
     dop_lut = LUT2d(slrg_per_blk, az_time_blk, dop_cnt_map)
@@ -832,16 +891,304 @@ def _get_az_block_interval_len(num_pls: int, az_block_dur: float, prf: float,
     return len_az_blk_dur, len_tm_int, num_blk_az
 
 
-def _azblk_slice_gen(num_pls: int, len_az_blk_dur: int, len_tm_int: int,
-                     num_blk_az: int):
-    """Slice index generator for azimuth blocks/range lines"""
-    # generate slice for azimuth block indexing
-    i_str = 0
-    i_stp = len_az_blk_dur
-    for bb in range(num_blk_az):
-        yield slice(i_str, i_stp)
-        i_str += len_tm_int
-        i_stp = min(i_str + len_az_blk_dur, num_pls)
+def _prefetch_gen(func, items):
+    """Generator of `func(item)` for all `items` in order, where the result
+    for the next item is computed in a background thread while the current
+    one is being consumed. Useful for overlapping I/O with computation.
+
+    """
+    items = list(items)
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(func, items[0])
+        for next_item in items[1:]:
+            result = future.result()
+            future = executor.submit(func, next_item)
+            yield result
+        yield future.result()
+
+
+def _with_raw_chunk_cache(raw_dset, num_pulses):
+    """Get a new raw decoder object whose HDF5 dataset is opened with a chunk
+    cache large enough for `num_pulses` range lines of all channels and range
+    bins, up to `_MAX_RAW_CHUNK_CACHE_NBYTES`.
+
+    The input decoder object is returned as is if its dataset is not a
+    chunked HDF5 dataset or if its chunk cache is already large enough.
+
+    """
+    dset = getattr(raw_dset, 'dataset', None)
+    if not isinstance(dset, h5py.Dataset) or dset.chunks is None:
+        return raw_dset
+    # pulses are along the second to last axis
+    shape_block = list(dset.shape)
+    shape_block[-2] = min(num_pulses, shape_block[-2])
+    item_nbytes = dset.id.get_type().get_size()
+    cache_nbytes = min(int(np.prod(shape_block)) * item_nbytes,
+                       _MAX_RAW_CHUNK_CACHE_NBYTES)
+    chunk_nbytes = int(np.prod(dset.chunks)) * item_nbytes
+    dapl = dset.id.get_access_plist()
+    nslots, nbytes, w0 = dapl.get_chunk_cache()
+    if cache_nbytes <= nbytes:
+        return raw_dset
+    # HDF5 recommends number of hash slots to be about 100 times the number
+    # of chunks fit in the cache
+    nslots = max(nslots, 100 * (cache_nbytes // chunk_nbytes + 1))
+    dapl.set_chunk_cache(nslots, cache_nbytes, w0)
+    return DataDecoder(h5py.Dataset(
+        h5py.h5d.open(dset.file.id, dset.name.encode(), dapl=dapl)))
+
+
+def _azblk_start_stop(num_pls: int, len_az_blk_dur: int, len_tm_int: int,
+                      num_blk_az: int) -> np.ndarray:
+    """(start, stop) range line indices of all azimuth blocks.
+
+    Returns
+    -------
+    np.ndarray(int32)
+        2-D array with shape (num_blk_az, 2) of [start, stop) indices
+
+    """
+    starts = np.arange(num_blk_az, dtype=np.int32) * len_tm_int
+    stops = np.minimum(starts + len_az_blk_dur, num_pls)
+    return np.stack([starts, stops], axis=1)
+
+
+@functools.lru_cache(maxsize=8)
+def _design_subband_filters(samprate, bw_flt, rolloff_flt, ripple_flt,
+                            stopatt_flt, fcnt_first, tot_rgbs):
+    """Design prototype LPF and freq-domain filters of three subbands.
+
+    Results are cached so repeated calls with the same parameters skip the
+    filter design and FFTs. Returned arrays are read-only.
+
+    Parameters
+    ----------
+    samprate : float
+        Fast-time sampling rate in (Hz)
+    bw_flt : float
+        Passband bandwidth of prototype LPF in (Hz)
+    rolloff_flt : float
+        Roll-off factor of prototype LPF
+    ripple_flt : float
+        Passband ripple of prototype LPF in (dB)
+    stopatt_flt : float
+        Stop-band attenuation of prototype LPF in (dB)
+    fcnt_first : float
+        Baseband center frequency of the first subband in (Hz).
+        The last subband is centered at `-fcnt_first`.
+    tot_rgbs : int
+        Total number of range bins to be filtered
+
+    Returns
+    -------
+    np.ndarray(float)
+        Prototype LPF coeffs
+    int
+        Number of FFT points
+    np.ndarray(complex64)
+        Spectrum of prototype LPF, mid band
+    np.ndarray(complex64)
+        Spectrum of BPF for the first band
+    np.ndarray(complex64)
+        Spectrum of BPF for the last band
+
+    """
+    coeff_lpf = cheby_equi_ripple_filter(samprate, bw_flt, rolloff_flt,
+                                         ripple_flt, stopatt_flt,
+                                         force_odd_len=True)
+    len_flt = len(coeff_lpf)
+
+    # Get number of FFT from convolution length
+    len_conv = tot_rgbs + len_flt - 1
+    nfft = fft.next_fast_len(len_conv)
+
+    # Get FFT of the real-valued prototype LPF from its half spectrum
+    # given the Hermitian symmetry of its full spectrum
+    coeff_lpf_rfft = fft.rfft(coeff_lpf, nfft)
+    len_rfft = coeff_lpf_rfft.size
+    coeff_lpf_fft = np.empty(nfft, dtype=np.complex64)
+    coeff_lpf_fft[:len_rfft] = coeff_lpf_rfft
+    coeff_lpf_fft[len_rfft:] = \
+        coeff_lpf_rfft[1:nfft - len_rfft + 1][::-1].conj()
+
+    # Get freq-domain BPFs Coeffs for two edge bands from LPF prototype.
+    # Keep all filter spectra in single precision like the echo to
+    # halve the memory traffic of the per-block filtering.
+    # Mixing LPF with a tone is a circular shift of its spectrum if the
+    # tone falls exactly on an FFT bin, otherwise the mixed LPFs are
+    # transformed.
+    shift_first = fcnt_first * nfft / samprate
+    if np.isclose(shift_first, round(shift_first), rtol=0, atol=1e-9):
+        shift_first = round(shift_first)
+        coef_bpf_fft_first = np.roll(coeff_lpf_fft, shift_first)
+        coef_bpf_fft_last = np.roll(coeff_lpf_fft, -shift_first)
+    else:
+        # Mixer func for up/down conversion of LPF -> BPF
+        def mixer_fun(fc):
+            return np.exp(1j * 2.0 * np.pi * fc / samprate *
+                          np.arange(len_flt)).astype(np.complex64)
+
+        coeff_lpf_sp = coeff_lpf.astype(np.float32)
+        coef_bpf_fft_first = fft.fft(
+            coeff_lpf_sp * mixer_fun(fcnt_first), nfft)
+        coef_bpf_fft_last = fft.fft(
+            coeff_lpf_sp * mixer_fun(-fcnt_first), nfft)
+
+    for arr in (coeff_lpf, coeff_lpf_fft, coef_bpf_fft_first,
+                coef_bpf_fft_last):
+        arr.setflags(write=False)
+
+    return (coeff_lpf, nfft, coeff_lpf_fft, coef_bpf_fft_first,
+            coef_bpf_fft_last)
+
+
+def _reshape_range_blocks(echo, num_rgb_avg):
+    """Reshape range axis of echo into (range blocks, range bins per block).
+
+    Trailing range bins not filling a whole block are dropped.
+
+    """
+    num_blk_rg = echo.shape[-1] // num_rgb_avg
+    return echo[..., :num_blk_rg * num_rgb_avg].reshape(
+        echo.shape[:-1] + (num_blk_rg, num_rgb_avg))
+
+
+def _pulse_tiles(echo_blk):
+    """Generator of tiles of range-blocked echo along pulses, each including
+    one more pulse than its step so that all lag-one pulse pairs are covered
+    once. Tiles are sized to about `_DOP_EST_TILE_NBYTES`.
+
+    Raises
+    ------
+    RuntimeError
+        If there are less than two pulses.
+
+    """
+    num_pls = echo_blk.shape[-3]
+    if num_pls < 2:
+        raise RuntimeError('Not enough samples for correlator along pulses')
+    nbytes_pulse = echo_blk.nbytes // num_pls
+    step = max(1, _DOP_EST_TILE_NBYTES // max(nbytes_pulse, 1) - 1)
+    for i_start in range(0, num_pls - 1, step):
+        yield echo_blk[..., i_start:i_start + step + 1, :, :]
+
+
+def _corr_doppler_est_blocks(echo, prf, num_rgb_avg):
+    """Correlation Doppler Estimator (CDE) for all range blocks at once.
+
+    Equivalent to calling `isce3.signal.corr_doppler_est` with a lag of one
+    along pulses for every block of `num_rgb_avg` range bins. Correlations
+    are accumulated over tiles of pulses to bound memory usage.
+
+    Parameters
+    ----------
+    echo : np.ndarray(complex)
+        Complex echo with last two dimensions being pulses by range bins.
+    prf : float
+        Pulse-repetition frequency in (Hz).
+    num_rgb_avg : int
+        Number of range bins per range block.
+
+    Returns
+    -------
+    np.ndarray(float)
+        Ambiguous Doppler centroids within [-0.5*prf, 0.5*prf] in (Hz)
+        per range block.
+    np.ndarray(float)
+        Correlation coefficients within [0, 1] per range block.
+
+    Raises
+    ------
+    RuntimeError
+        If there are less than two pulses.
+
+    """
+    echo_blk = _reshape_range_blocks(echo, num_rgb_avg)
+    # reduce over pulses and range bins within each range block
+    axis = (-3, -1)
+    shape_out = echo_blk.shape[:-3] + echo_blk.shape[-2:-1]
+    xcor_cmp = np.zeros(shape_out, dtype=np.complex128)
+    # power of all pulses but the last one
+    pow_lead = np.zeros(shape_out, dtype=np.float64)
+    for tile in _pulse_tiles(echo_blk):
+        xcor_cmp += (tile[..., 1:, :, :] *
+                     tile[..., :-1, :, :].conj()).sum(axis=axis)
+        tile_lead = tile[..., :-1, :, :]
+        pow_lead += (tile_lead.real**2 + tile_lead.imag**2).sum(axis=axis)
+    # power of all pulses but the first one
+    pulse_first = echo_blk[..., 0, :, :]
+    pulse_last = echo_blk[..., -1, :, :]
+    pow_lag = (pow_lead -
+               (pulse_first.real**2 + pulse_first.imag**2).sum(axis=-1) +
+               (pulse_last.real**2 + pulse_last.imag**2).sum(axis=-1))
+    # get mag of product of auto correlations. Normalization by the number
+    # of pairs is common to cross and auto correlations.
+    acor_mag = np.sqrt(pow_lag * pow_lead)
+    # calculate correlation coefficient
+    corr_coef = np.zeros(shape_out, dtype=np.float64)
+    np.divide(abs(xcor_cmp), acor_mag, out=corr_coef, where=acor_mag > 0)
+    dtype_out = echo_blk.real.dtype
+    return ((prf / (2.0 * np.pi) * np.angle(xcor_cmp)).astype(dtype_out),
+            corr_coef.astype(dtype_out))
+
+
+def _sign_doppler_est_blocks(echo, prf, num_rgb_avg):
+    """Sign-Doppler estimator (SDE) for all range blocks at once.
+
+    Equivalent to calling `isce3.signal.sign_doppler_est` with a lag of one
+    along pulses for every block of `num_rgb_avg` range bins. Sign products
+    are counted over tiles of pulses to bound memory usage.
+
+    Parameters
+    ----------
+    echo : np.ndarray(complex)
+        Complex echo with last two dimensions being pulses by range bins.
+    prf : float
+        Pulse-repetition frequency in (Hz).
+    num_rgb_avg : int
+        Number of range bins per range block.
+
+    Returns
+    -------
+    np.ndarray(float)
+        Ambiguous Doppler centroids within [-0.5*prf, 0.5*prf] in (Hz)
+        per range block.
+    np.ndarray(float)
+        Correlation coefficients per range block, all set to one.
+
+    Raises
+    ------
+    RuntimeError
+        If there are less than two pulses.
+
+    """
+    echo_blk = _reshape_range_blocks(echo, num_rgb_avg)
+    shape_out = echo_blk.shape[:-3] + echo_blk.shape[-2:-1]
+    # number of lag-one pairs with different signs for II, QQ, IQ and QI
+    num_diff = np.zeros((4,) + shape_out, dtype=np.int64)
+    for tile in _pulse_tiles(echo_blk):
+        # negative-sign bits where zero values are treated as positive.
+        # Signs are kept as one byte per sample and the product of two signs
+        # is formed via XOR of their bits, that is 1 - 2 * (a ^ b).
+        neg_i = tile.real < 0
+        neg_q = tile.imag < 0
+        for n, (neg_lag, neg_lead) in enumerate(
+                [(neg_i, neg_i), (neg_q, neg_q), (neg_i, neg_q),
+                 (neg_q, neg_i)]):
+            # reduce over pulses and range bins within each range block
+            num_diff[n] += np.count_nonzero(
+                neg_lag[..., 1:, :, :] ^ neg_lead[..., :-1, :, :],
+                axis=(-3, -1))
+    num_pairs = (echo_blk.shape[-3] - 1) * num_rgb_avg
+    xcor_ii, xcor_qq, xcor_iq, xcor_qi = 1.0 - (2.0 / num_pairs) * num_diff
+    r_sinlaw = np.sin(0.5 * np.pi * np.asarray([xcor_ii, xcor_qq,
+                                                xcor_qi, -xcor_iq]))
+    xcor_cmp = 0.5 * ((r_sinlaw[0] + r_sinlaw[1]) +
+                      1j * (r_sinlaw[2] + r_sinlaw[3]))
+    return (prf / (2.0 * np.pi) * np.angle(xcor_cmp),
+            np.ones(xcor_cmp.shape, dtype='float32'))
 
 
 def _form_mask_valid_range(tot_rgbs, rgb_valid_sbsw):
@@ -860,7 +1207,13 @@ def _form_mask_valid_range(tot_rgbs, rgb_valid_sbsw):
         Mask array for valid range bins
 
     """
-    msk_valid_rg = np.zeros(tot_rgbs, dtype=bool)
-    for start_stop in rgb_valid_sbsw:
-        msk_valid_rg[slice(*start_stop)] = True
-    return msk_valid_rg
+    rgb_valid_sbsw = np.asarray(rgb_valid_sbsw, dtype=int).reshape(-1, 2)
+    starts, stops = np.clip(rgb_valid_sbsw, 0, tot_rgbs).T
+    # discard empty [start, stop) intervals
+    mask_non_empty = starts < stops
+    # use difference array of interval edges whose cumulative sum is the
+    # number of subswaths covering each range bin
+    diff_edges = np.zeros(tot_rgbs + 1, dtype=np.int32)
+    np.add.at(diff_edges, starts[mask_non_empty], 1)
+    np.add.at(diff_edges, stops[mask_non_empty], -1)
+    return np.cumsum(diff_edges[:-1]) > 0
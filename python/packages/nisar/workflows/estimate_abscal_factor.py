@@ -2,17 +2,27 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
 import traceback
 import warnings
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, List, Optional
 
+import numpy as np
+
 import isce3
 import nisar
 
+# Size, in bytes, and number of hash table slots of the HDF5 raw data chunk cache used
+# when reading the RSLC image data. The number of slots should be a prime number.
+_CHUNK_CACHE_NBYTES = 128 * 1024**2
+_CHUNK_CACHE_NSLOTS = 50021
+
 
 class DateTimeEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -21,6 +31,60 @@ class DateTimeEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+@dataclass(frozen=True)
+class AbsCalFactors:
+    """
+    Absolute radiometric calibration factors of an RSLC product estimated from corner
+    reflectors, with one array element per corner reflector.
+
+    Parameters
+    ----------
+    id : numpy.ndarray
+        The unique identifiers of the corner reflectors.
+    absolute_calibration_factor : numpy.ndarray
+        The absolute radiometric calibration error for each corner reflector (the ratio
+        of the measured RCS to the predicted RCS), in linear units.
+    timestamp : numpy.ndarray
+        The corner reflector observation times, as `isce3.core.DateTime` objects.
+    frequency : numpy.ndarray
+        The frequency sub-band of the data.
+    polarization : numpy.ndarray
+        The transmit and receive polarization of the data.
+    """
+
+    id: np.ndarray
+    absolute_calibration_factor: np.ndarray
+    timestamp: np.ndarray
+    frequency: np.ndarray
+    polarization: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def to_records(self) -> List[dict[str, Any]]:
+        """
+        Convert to a JSON-like list of dicts with one entry per corner reflector.
+
+        The keys of each dict are the names of the fields of this object.
+        """
+        return [
+            {
+                "id": cr_id,
+                "absolute_calibration_factor": float(factor),
+                "timestamp": timestamp,
+                "frequency": str(freq),
+                "polarization": str(pol),
+            }
+            for cr_id, factor, timestamp, freq, pol in zip(
+                self.id,
+                self.absolute_calibration_factor,
+                self.timestamp,
+                self.frequency,
+                self.polarization,
+            )
+        ]
+
+
 def estimate_abscal_factor(
     corner_reflectors: Iterable[isce3.cal.TriangularTrihedralCornerReflector],
     rslc: nisar.products.readers.SLC,
@@ -34,7 +98,7 @@ def estimate_abscal_factor(
     nfit: int = 5,
     power_method: str = "box",
     pthresh: float = 3.0,
-) -> List[dict[str, Any]]:
+) -> AbsCalFactors:
     r"""
     Estimate the absolute radiometric calibration factor of an RSLC product with one or
     more corner reflectors (CRs).
@@ -115,25 +179,10 @@ def estimate_abscal_factor(
 
     Returns
     -------
-    results : list of dict
-        A list of dicts containing one entry per corner reflector found in the scene.
-        The dict of results for each corner reflector consists of the following keys:
-
-        'id':
-          The unique identifier of the corner reflector.
-
-        'absolute_calibration_factor':
-          The absolute radiometric calibration error for the corner reflector (the ratio
-          of the measured RCS to the predicted RCS), in linear units.
-
-        'timestamp':
-          The corner reflector observation time.
-
-        'frequency':
-          The frequency sub-band of the data.
-
-        'polarization':
-          The transmit and receive polarization of the data.
+    results : AbsCalFactors
+        The results for all corner reflectors found in the scene, with one array
+        element per corner reflector for each field. Use `AbsCalFactors.to_records()`
+        to get a JSON-like list of dicts.
 
     References
     ----------
@@ -170,8 +219,15 @@ def estimate_abscal_factor(
 
     # Get the RSLC image data for the specified frequency sub-band & polarization and
     # wrap it in a decoder layer that handles converting half-precision complex values
-    # to single-precision.
-    img_dataset = rslc.getSlcDataset(freq, pol)
+    # to single-precision. Use a larger chunk cache than the HDF5 default (1 MiB) so
+    # that chunks shared by the chips of nearby corner reflectors are decompressed
+    # only once.
+    img_dataset = rslc.getSlcDataset(
+        freq,
+        pol,
+        rdcc_nbytes=_CHUNK_CACHE_NBYTES,
+        rdcc_nslots=_CHUNK_CACHE_NSLOTS,
+    )
     img_data = nisar.types.ComplexFloat16Decoder(img_dataset)
 
     # Get the radar grid on which the image data is sampled.
@@ -193,42 +249,53 @@ def estimate_abscal_factor(
     else:
         orbit = external_orbit
 
+    # Bind the arguments that are common to all corner reflectors.
+    predict_rcs = functools.partial(
+        isce3.cal.predict_triangular_trihedral_cr_rcs,
+        orbit=orbit,
+        doppler=native_doppler,
+        wavelength=radar_grid.wavelength,
+        look_side=radar_grid.lookside,
+    )
+    measure_rcs = functools.partial(
+        isce3.cal.measure_target_rcs,
+        img_data=img_data,
+        radar_grid=radar_grid,
+        orbit=orbit,
+        doppler=image_grid_doppler,
+        ellipsoid=ellipsoid,
+        nchip=nchip,
+        upsample_factor=upsample_factor,
+        peak_find_domain=peak_find_domain,
+        nfit=nfit,
+        power_method=power_method,
+        pthresh=pthresh,
+    )
+
     # Estimate the absolute calibration error (the ratio of the measured RCS to the
     # predicted RCS) for a single corner reflector.
     def estimate_abscal_error(
         cr: isce3.cal.TriangularTrihedralCornerReflector,
     ) -> float:
-        predicted_rcs = isce3.cal.predict_triangular_trihedral_cr_rcs(
-            cr=cr,
-            orbit=orbit,
-            doppler=native_doppler,
-            wavelength=radar_grid.wavelength,
-            look_side=radar_grid.lookside,
-        )
-
-        measured_rcs = isce3.cal.measure_target_rcs(
-            target_llh=cr.llh,
-            img_data=img_data,
-            radar_grid=radar_grid,
-            orbit=orbit,
-            doppler=image_grid_doppler,
-            ellipsoid=ellipsoid,
-            nchip=nchip,
-            upsample_factor=upsample_factor,
-            peak_find_domain=peak_find_domain,
-            nfit=nfit,
-            power_method=power_method,
-            pthresh=pthresh,
-        )
-
-        return measured_rcs / predicted_rcs
-
-    # Estimate the absolute radiometric calibration error of each corner reflector, and
-    # format the results into an object that can be easily JSON-ified.
-    results = []
-    for cr in corner_reflectors:
+        return measure_rcs(target_llh=cr.llh) / predict_rcs(cr=cr)
+
+    # Estimate the absolute radiometric calibration error of each corner reflector.
+    # The corner reflectors are independent of one another, so they're processed
+    # concurrently in a pool of threads. Results are collected in input order.
+    corner_reflectors = list(corner_reflectors)
+    with ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(estimate_abscal_error, cr) for cr in corner_reflectors
+        ]
+
+    # Fill preallocated output buffers with the results of each CR that was
+    # successfully processed.
+    cr_id_arr = np.empty(len(corner_reflectors), dtype=object)
+    abscal_errors = np.empty(len(corner_reflectors), dtype=np.float64)
+    num_crs = 0
+    for cr, future in zip(corner_reflectors, futures):
         try:
-            abscal_error = estimate_abscal_error(cr)
+            abscal_errors[num_crs] = future.result()
         except Exception as e:
             errmsg = "".join(traceback.format_exception(e))
             warnings.warn(
@@ -238,19 +305,24 @@ def estimate_abscal_factor(
             )
             continue
 
-        # TODO: Update 'timestamp' to be the actual observation time of the corner
-        # reflector from geo2rdr().
-        results.append(
-            {
-                "id": cr.id,
-                "absolute_calibration_factor": abscal_error,
-                "timestamp": rslc.identification.zdStartTime,
-                "frequency": freq,
-                "polarization": pol,
-            }
-        )
+        cr_id_arr[num_crs] = cr.id
+        num_crs += 1
+
+    cr_id_arr = cr_id_arr[:num_crs]
+    abscal_errors = abscal_errors[:num_crs]
 
-    return results
+    # TODO: Update 'timestamp' to be the actual observation time of the corner
+    # reflector from geo2rdr().
+    timestamps = np.empty(num_crs, dtype=object)
+    timestamps.fill(rslc.identification.zdStartTime)
+
+    return AbsCalFactors(
+        id=cr_id_arr,
+        absolute_calibration_factor=abscal_errors,
+        timestamp=timestamps,
+        frequency=np.full(num_crs, freq),
+        polarization=np.full(num_crs, pol),
+    )
 
 
 def parse_cmdline_args() -> dict[str, Any]:
@@ -443,7 +515,7 @@ def main(
 
     if output_json is None:
         # Print results to console in JSON format.
-        print(json.dumps(results, indent=2, cls=DateTimeEncoder))
+        print(json.dumps(results.to_records(), indent=2, cls=DateTimeEncoder))
     else:
         output_json = Path(output_json)
 
@@ -453,7 +525,7 @@ def main(
 
         # Write results to file in JSON format. Overwrite file if it exists.
         with output_json.open("w") as f:
-            json.dump(results, f, indent=2, cls=DateTimeEncoder)
+            json.dump(results.to_records(), f, indent=2, cls=DateTimeEncoder)
 
 
 if __name__ == "__main__":
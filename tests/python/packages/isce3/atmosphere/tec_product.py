@@ -0,0 +1,150 @@
+import json
+import os
+import types
+
+import numpy as np
+import pytest
+
+import iscetest
+import isce3
+from isce3.atmosphere.tec_product import (_compute_incidence_angles,
+                                          tec_lut2d_from_json)
+from isce3.geometry import compute_incidence_angle
+from nisar.products.readers import SLC
+
+
+def write_tec_json(json_path, t_tec, ref_epoch, tec_near, tec_far):
+    '''
+    write TEC JSON with total TEC at near and far range and zero top TEC for
+    the given times in seconds since ref_epoch
+    '''
+    tec_zeros = list(np.zeros(len(t_tec)))
+    tec_dict = {}
+    tec_dict['utc'] = [(ref_epoch + isce3.core.TimeDelta(t)).isoformat()[:-3]
+                       for t in t_tec]
+    tec_dict['totTecNr'] = list(tec_near)
+    tec_dict['topTecNr'] = tec_zeros
+    tec_dict['totTecFr'] = list(tec_far)
+    tec_dict['topTecFr'] = tec_zeros
+    with open(json_path, 'w') as fp:
+        json.dump(tec_dict, fp)
+
+
+@pytest.fixture(scope='module')
+def unit_test_params(tmp_path_factory):
+    '''
+    test parameters shared by all tec_product tests
+    '''
+    params = types.SimpleNamespace()
+
+    input_h5_path = os.path.join(iscetest.data, "envisat.h5")
+    params.radargrid = isce3.product.RadarGridParameters(input_h5_path)
+
+    rslc = SLC(hdf5file=input_h5_path)
+    params.orbit = rslc.getOrbit()
+    params.center_freq = rslc.getSwathMetadata().processed_center_frequency
+
+    params.dem_path = os.path.join(iscetest.data, "geocode/zeroHeightDEM.geo")
+
+    # TEC every 10 sec, +/- 50 sec from start/stop of radar grid
+    radar_grid = params.radargrid
+    params.t_tec = np.arange(np.floor(radar_grid.sensing_start) - 50.0,
+                             np.ceil(radar_grid.sensing_stop) + 51.0, 10.0)
+    params.tec_near = np.linspace(10.0, 12.0, len(params.t_tec))
+    params.tec_far = np.linspace(8.0, 9.0, len(params.t_tec))
+    params.tec_json_path = os.fspath(
+        tmp_path_factory.mktemp('tec') / 'tec.json')
+    write_tec_json(params.tec_json_path, params.t_tec, radar_grid.ref_epoch,
+                   params.tec_near, params.tec_far)
+
+    return params
+
+
+def test_epsg_skips_dem(unit_test_params, tmp_path, monkeypatch):
+    p = unit_test_params
+
+    lut_ref = tec_lut2d_from_json(p.tec_json_path, p.center_freq, p.orbit,
+                                  p.radargrid, isce3.core.LUT2d(),
+                                  p.dem_path)
+    epsg = isce3.io.Raster(p.dem_path).get_epsg()
+
+    # DEM must not be opened if its EPSG is provided
+    def raster_not_allowed(*args, **kwargs):
+        raise AssertionError('DEM raster was opened')
+    monkeypatch.setattr(isce3.io, 'Raster', raster_not_allowed)
+
+    lut = tec_lut2d_from_json(p.tec_json_path, p.center_freq, p.orbit,
+                              p.radargrid, isce3.core.LUT2d(),
+                              os.fspath(tmp_path / 'missing_dem.tif'),
+                              epsg=epsg)
+
+    assert lut.x_start == lut_ref.x_start
+    assert lut.y_start == lut_ref.y_start
+    assert lut.x_spacing == lut_ref.x_spacing
+    assert lut.y_spacing == lut_ref.y_spacing
+    np.testing.assert_array_equal(lut.data, lut_ref.data)
+
+
+def test_compute_incidence_angles(unit_test_params):
+    p = unit_test_params
+    radar_grid = p.radargrid
+
+    # several azimuth times at near and far range of radar grid
+    az_times = np.linspace(radar_grid.sensing_start, radar_grid.sensing_stop,
+                           5)
+    slant_ranges = [radar_grid.starting_range, radar_grid.end_range]
+    doppler = isce3.core.LUT2d()
+    dem_interp = isce3.geometry.DEMInterpolator()
+    ellipsoid = isce3.core.Ellipsoid()
+
+    incidence = _compute_incidence_angles(az_times, slant_ranges, p.orbit,
+                                          doppler, radar_grid, dem_interp,
+                                          ellipsoid, n_workers=2)
+
+    incidence_ref = np.array([[compute_incidence_angle(t, srange, p.orbit,
+                                                       doppler, radar_grid,
+                                                       dem_interp, ellipsoid)
+                               for srange in slant_ranges]
+                              for t in az_times])
+    np.testing.assert_allclose(incidence, incidence_ref, rtol=0.0,
+                               atol=1e-9)
+
+
+def test_tec_outside_radar_grid(unit_test_params, tmp_path):
+    p = unit_test_params
+    radar_grid = p.radargrid
+
+    # TEC times all well after end of radar grid plus margin
+    json_path = os.fspath(tmp_path / 'tec_late.json')
+    write_tec_json(json_path, p.t_tec + 1000.0, radar_grid.ref_epoch,
+                   p.tec_near, p.tec_far)
+
+    with pytest.raises(ValueError, match='has no data between'):
+        tec_lut2d_from_json(json_path, p.center_freq, p.orbit, radar_grid,
+                            isce3.core.LUT2d(), p.dem_path)
+
+
+def test_tec_non_contiguous_times(unit_test_params, tmp_path):
+    p = unit_test_params
+    radar_grid = p.radargrid
+
+    lut_ref = tec_lut2d_from_json(p.tec_json_path, p.center_freq, p.orbit,
+                                  radar_grid, isce3.core.LUT2d(), p.dem_path)
+
+    # Insert samples far outside of radar grid in the middle of the TEC data
+    # so that the samples within the radar grid are not contiguous
+    i_mid = len(p.t_tec) // 2
+    t_tec = np.insert(p.t_tec, i_mid, [p.t_tec[-1] + 1000.0,
+                                       p.t_tec[0] - 1000.0])
+    tec_near = np.insert(p.tec_near, i_mid, [1e3, 1e3])
+    tec_far = np.insert(p.tec_far, i_mid, [1e3, 1e3])
+    json_path = os.fspath(tmp_path / 'tec_non_contiguous.json')
+    write_tec_json(json_path, t_tec, radar_grid.ref_epoch, tec_near, tec_far)
+
+    lut = tec_lut2d_from_json(json_path, p.center_freq, p.orbit, radar_grid,
+                              isce3.core.LUT2d(), p.dem_path)
+
+    assert lut.y_start == lut_ref.y_start
+    assert lut.y_spacing == lut_ref.y_spacing
+    assert lut.length == lut_ref.length
+    np.testing.assert_array_equal(lut.data, lut_ref.data)
@@ -1,7 +1,10 @@
 import iscetest
 from nisar.workflows import doppler_lut_from_raw
+from nisar.workflows.doppler_lut_from_raw import (_corr_doppler_est_blocks,
+                                                  _sign_doppler_est_blocks)
 from nisar.products.readers.Raw import open_rrsd
 from isce3.core import speed_of_light
+from isce3.signal import corr_doppler_est, sign_doppler_est
 
 import os
 import numpy as np
@@ -249,3 +252,66 @@ class TestDopplerLutFromRaw:
             dop_lut, num_rgb_avg=8,
             err_msg=' in time approach with polyfitted output'
         )
+
+
+def _simulate_echo_doppler(num_pulses, num_rgbs, prf, seed=0):
+    """Noisy complex64 echo of pulses by range bins whose Doppler varies
+    linearly over range bins, with some exact zeros in I and Q."""
+    rng = np.random.default_rng(seed)
+    dop = np.linspace(-0.4 * prf, 0.4 * prf, num_rgbs)
+    tm = np.arange(num_pulses) / prf
+    echo = np.exp(2j * np.pi * dop * tm[:, None])
+    echo += 0.5 * (rng.standard_normal(echo.shape) +
+                   1j * rng.standard_normal(echo.shape))
+    echo = echo.astype(np.complex64)
+    echo.real[::7, ::5] = 0
+    echo.imag[::5, ::3] = 0
+    return echo
+
+
+def test_corr_doppler_est_blocks():
+    prf = 1650.0
+    num_rgb_avg = 8
+    # three bands stacked along the first axis as used for subbanding
+    echo = np.stack([_simulate_echo_doppler(200, 68, prf, seed=n)
+                     for n in range(3)])
+    dop, corr = _corr_doppler_est_blocks(echo, prf, num_rgb_avg)
+    npt.assert_equal(dop.shape, (3, 68 // num_rgb_avg),
+                     err_msg='Wrong shape of block-wise Doppler')
+    for band in range(echo.shape[0]):
+        for blk in range(dop.shape[-1]):
+            echo_blk = echo[band, :, blk * num_rgb_avg:
+                            (blk + 1) * num_rgb_avg]
+            dop_ref, corr_ref = corr_doppler_est(echo_blk, prf)
+            npt.assert_allclose(
+                dop[band, blk], dop_ref, rtol=0, atol=1e-3,
+                err_msg=f'Wrong CDE Doppler for band {band} block {blk}')
+            npt.assert_allclose(
+                corr[band, blk], corr_ref, rtol=0,
+                atol=4 * np.finfo(np.float32).eps,
+                err_msg=f'Wrong CDE corr coef for band {band} block {blk}')
+
+
+def test_sign_doppler_est_blocks():
+    prf = 1650.0
+    num_rgb_avg = 8
+    echo = _simulate_echo_doppler(200, 68, prf)
+    dop, corr = _sign_doppler_est_blocks(echo, prf, num_rgb_avg)
+    npt.assert_equal(dop.shape, (68 // num_rgb_avg,),
+                     err_msg='Wrong shape of block-wise Doppler')
+    npt.assert_equal(corr, 1, err_msg='SDE corr coefs must be all one')
+    for blk in range(dop.size):
+        echo_blk = echo[:, blk * num_rgb_avg:(blk + 1) * num_rgb_avg]
+        npt.assert_allclose(
+            dop[blk], sign_doppler_est(echo_blk, prf), rtol=0, atol=1e-3,
+            err_msg=f'Wrong SDE Doppler for block {blk}')
+
+
+def test_doppler_est_blocks_single_pulse():
+    prf = 1650.0
+    # a block with a single range line has no lag-one pulse pair
+    echo = _simulate_echo_doppler(1, 16, prf)
+    for dop_est_blocks in (_corr_doppler_est_blocks,
+                           _sign_doppler_est_blocks):
+        with npt.assert_raises(RuntimeError):
+            dop_est_blocks(echo, prf, 8)
@@ -1,6 +1,7 @@
+import functools
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import numpy as np
 import pytest
@@ -9,7 +10,31 @@ from numpy.typing import ArrayLike
 import isce3
 import iscetest
 import nisar
-from nisar.workflows.estimate_abscal_factor import estimate_abscal_factor
+from nisar.workflows.estimate_abscal_factor import (
+    _CHUNK_CACHE_NBYTES,
+    _CHUNK_CACHE_NSLOTS,
+    estimate_abscal_factor,
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_cr_csv_cached(
+    path: str, mtime_ns: int, size: int
+) -> Tuple[isce3.cal.TriangularTrihedralCornerReflector, ...]:
+    return tuple(isce3.cal.parse_triangular_trihedral_cr_csv(path))
+
+
+def parse_cr_csv(
+    cr_csv: os.PathLike,
+) -> Tuple[isce3.cal.TriangularTrihedralCornerReflector, ...]:
+    """
+    Parse corner reflector CSV file, caching the results for repeated calls on an
+    unchanged file (same canonical path, modification time and size).
+    """
+    stat = os.stat(cr_csv)
+    return _parse_cr_csv_cached(
+        os.path.realpath(cr_csv), stat.st_mtime_ns, stat.st_size
+    )
 
 
 def get_test_data(bandwidth: str = "20mhz") -> Dict[str, Any]:
@@ -19,13 +44,15 @@ def get_test_data(bandwidth: str = "20mhz") -> Dict[str, Any]:
     rslc_hdf5 = datadir / f"calib_slc_pass1_{bandwidth}.h5"
 
     # Parse corner reflector CSV file and RSLC HDF5 file.
-    corner_reflectors = isce3.cal.parse_triangular_trihedral_cr_csv(cr_csv)
+    corner_reflectors = parse_cr_csv(cr_csv)
 
     # Get RSLC product image data.
     rslc = nisar.products.readers.SLC(hdf5file=os.fspath(rslc_hdf5))
     freq = "A"
     pol = "HH"
-    img_dataset = rslc.getSlcDataset(freq, pol)
+    img_dataset = rslc.getSlcDataset(
+        freq, pol, rdcc_nbytes=_CHUNK_CACHE_NBYTES, rdcc_nslots=_CHUNK_CACHE_NSLOTS
+    )
     img_data = nisar.types.ComplexFloat16Decoder(img_dataset)
 
     # Get product metadata.
@@ -50,12 +77,25 @@ def get_test_data(bandwidth: str = "20mhz") -> Dict[str, Any]:
     )
 
 
+@pytest.fixture(scope="module", params=["5mhz", "20mhz"])
+def rslc_data(request) -> Dict[str, Any]:
+    """Corner reflector and RSLC data for each bandwidth, loaded once per module."""
+    return get_test_data(request.param)
+
+
+@pytest.fixture(scope="module")
+def rslc_data_20mhz() -> Dict[str, Any]:
+    """Corner reflector and 20 MHz RSLC data, loaded once per module."""
+    return get_test_data("20mhz")
+
+
 def get_triangular_trihedral_cr_peak_rcs(
-    side_length: float, wavelength: float
-) -> float:
+    side_length: ArrayLike, wavelength: float
+) -> np.ndarray:
     """
-    Compute the maximum RCS, in meters^2, of a triangular trihedral corner reflector.
+    Compute the maximum RCS, in meters^2, of triangular trihedral corner reflectors.
     """
+    side_length = np.asanyarray(side_length, dtype=np.float64)
     return 4.0 * np.pi * side_length ** 4 / (3 * wavelength ** 2)
 
 
@@ -64,78 +104,150 @@ def pow2db(x: ArrayLike) -> np.ndarray:
     return 10.0 * np.log10(x)
 
 
-@pytest.mark.parametrize("bandwidth", ["5mhz", "20mhz"])
-def test_predict_triangular_trihedral_cr_rcs(bandwidth):
-    d = get_test_data(bandwidth)
-
-    for cr in d["corner_reflectors"]:
-        # Compute predicted RCS.
-        predicted_rcs = isce3.cal.predict_triangular_trihedral_cr_rcs(
-            cr=cr,
-            orbit=d["orbit"],
-            doppler=d["native_doppler"],
-            wavelength=d["radar_grid"].wavelength,
-            look_side=d["radar_grid"].lookside,
-        )
-        predicted_rcs_db = pow2db(predicted_rcs)
+def test_predict_triangular_trihedral_cr_rcs(rslc_data):
+    d = rslc_data
+    corner_reflectors = d["corner_reflectors"]
 
-        # Get maximum RCS for the corner reflector.
-        peak_rcs = get_triangular_trihedral_cr_peak_rcs(
-            cr.side_length, d["radar_grid"].wavelength
-        )
-        peak_rcs_db = pow2db(peak_rcs)
+    # Compute predicted RCS of all corner reflectors.
+    predicted_rcs = np.fromiter(
+        (
+            isce3.cal.predict_triangular_trihedral_cr_rcs(
+                cr=cr,
+                orbit=d["orbit"],
+                doppler=d["native_doppler"],
+                wavelength=d["radar_grid"].wavelength,
+                look_side=d["radar_grid"].lookside,
+            )
+            for cr in corner_reflectors
+        ),
+        dtype=np.float64,
+        count=len(corner_reflectors),
+    )
+    predicted_rcs_db = pow2db(predicted_rcs)
 
-        # These corner reflectors were simulated such that their boresight was aligned
-        # with the line-of-sight vector. The predicted RCS for each corner reflector
-        # should therefore be close to the peak RCS (within .001 dB).
-        assert np.isclose(predicted_rcs_db, peak_rcs_db, rtol=0.0, atol=1e-3)
+    # Get maximum RCS for all corner reflectors.
+    side_lengths = np.fromiter(
+        (cr.side_length for cr in corner_reflectors),
+        dtype=np.float64,
+        count=len(corner_reflectors),
+    )
+    peak_rcs_db = pow2db(
+        get_triangular_trihedral_cr_peak_rcs(side_lengths, d["radar_grid"].wavelength)
+    )
 
+    # These corner reflectors were simulated such that their boresight was aligned
+    # with the line-of-sight vector. The predicted RCS for each corner reflector
+    # should therefore be close to the peak RCS (within .001 dB).
+    np.testing.assert_allclose(predicted_rcs_db, peak_rcs_db, rtol=0.0, atol=1e-3)
 
-class TestMeasureTargetRCS:
-    @pytest.mark.parametrize("peak_find_domain", ["time", "freq"])
-    def test_measure_target_rcs(self, peak_find_domain: str):
-        d = get_test_data()
 
-        def measure_rcs_db(cr: isce3.cal.TriangularTrihedralCornerReflector) -> float:
-            rcs = isce3.cal.measure_target_rcs(
-                target_llh=cr.llh,
-                img_data=d["img_data"],
-                radar_grid=d["radar_grid"],
-                orbit=d["orbit"],
-                doppler=d["image_grid_doppler"],
-                ellipsoid=d["ellipsoid"],
-                nchip=4,
-                upsample_factor=128,
-                peak_find_domain=peak_find_domain,
-            )
-            return pow2db(rcs)
+@pytest.fixture(scope="module")
+def border_llhs(rslc_data_20mhz) -> Dict[str, isce3.core.LLH]:
+    """
+    LLH positions of targets just outside of ("out") and just inside of ("near") the
+    image grid bounds.
+    """
+    d = rslc_data_20mhz
+    radar_grid = d["radar_grid"]
 
-        # Get the apparent RCS of each corner reflector.
-        rcs_values_db = np.asarray(
-            [measure_rcs_db(cr) for cr in d["corner_reflectors"]]
+    def rdr2geo_llh(srange: float) -> isce3.core.LLH:
+        llh = isce3.geometry.rdr2geo(
+            aztime=radar_grid.sensing_mid,
+            range=srange,
+            orbit=d["orbit"],
+            side=radar_grid.lookside,
+            doppler=0.0,
+            wavelength=radar_grid.wavelength,
+            ellipsoid=d["ellipsoid"],
         )
-        assert len(rcs_values_db) == 3
+        return isce3.core.LLH(*llh)
 
-        # Check that the RCS of each corner reflector is approximately equal
-        # (within 0.1 dB).
-        max_rcs_db = np.max(rcs_values_db)
-        min_rcs_db = np.min(rcs_values_db)
-        assert np.isclose(max_rcs_db, min_rcs_db, atol=0.1)
+    return dict(
+        out=rdr2geo_llh(radar_grid.end_range + radar_grid.range_pixel_spacing),
+        near=rdr2geo_llh(radar_grid.end_range - radar_grid.range_pixel_spacing),
+    )
 
-    def test_out_of_bounds(self):
-        d = get_test_data()
 
-        # Get LLH position of a target just outside of the image grid bounds.
-        llh = isce3.geometry.rdr2geo(
-            aztime=d["radar_grid"].sensing_mid,
-            range=d["radar_grid"].end_range + d["radar_grid"].range_pixel_spacing,
+class TestMeasureTargetRCS:
+    def test_measure_target_rcs(self, rslc_data_20mhz):
+        d = rslc_data_20mhz
+
+        crs = d["corner_reflectors"]
+        llhs = np.empty((len(crs), 3), dtype=np.float64)
+        for i, cr in enumerate(crs):
+            llhs[i] = cr.llh.longitude, cr.llh.latitude, cr.llh.height
+
+        # Bind the arguments that are common to all measurements.
+        measure_rcs = functools.partial(
+            isce3.cal.measure_target_rcs_batch,
+            target_llhs=llhs,
+            img_data=d["img_data"],
+            radar_grid=d["radar_grid"],
             orbit=d["orbit"],
-            side=d["radar_grid"].lookside,
-            doppler=0.0,
-            wavelength=d["radar_grid"].wavelength,
+            doppler=d["image_grid_doppler"],
             ellipsoid=d["ellipsoid"],
+            nchip=4,
+            upsample_factor=128,
+        )
+
+        for peak_find_domain in ("time", "freq"):
+            # Get the apparent RCS of all corner reflectors at once.
+            rcs_values = measure_rcs(peak_find_domain=peak_find_domain)
+            rcs_values_db = pow2db(rcs_values)
+            assert len(rcs_values_db) == 3
+
+            # Check that the RCS of each corner reflector is approximately equal
+            # (within 0.1 dB).
+            max_rcs_db = np.max(rcs_values_db)
+            min_rcs_db = np.min(rcs_values_db)
+            assert np.isclose(max_rcs_db, min_rcs_db, atol=0.1), peak_find_domain
+
+    # An infinite area ratio always reads the block spanning all chips at once, while
+    # a zero area ratio forces each chip to be read separately.
+    @pytest.mark.parametrize("max_area_ratio", [np.inf, 0.0])
+    @pytest.mark.parametrize("llh_input", ["llh_objects", "array"])
+    @pytest.mark.parametrize("max_workers", [None, 1])
+    def test_batch_matches_single(
+        self, rslc_data_20mhz, monkeypatch, max_area_ratio, llh_input, max_workers
+    ):
+        d = rslc_data_20mhz
+
+        monkeypatch.setattr(
+            "isce3.cal.radar_cross_section._MAX_CHIPS_BLOCK_AREA_RATIO",
+            max_area_ratio,
         )
 
+        # Shuffle the targets so that they're not in order of azimuth time.
+        rng = np.random.default_rng(1234)
+        crs = [d["corner_reflectors"][i] for i in rng.permutation(3)]
+        if llh_input == "llh_objects":
+            target_llhs = [cr.llh for cr in crs]
+        else:
+            target_llhs = np.array([cr.llh.to_vec3() for cr in crs])
+
+        kwargs = dict(
+            img_data=d["img_data"],
+            radar_grid=d["radar_grid"],
+            orbit=d["orbit"],
+            doppler=d["image_grid_doppler"],
+            ellipsoid=d["ellipsoid"],
+            nchip=4,
+            upsample_factor=128,
+        )
+        rcs_values = isce3.cal.measure_target_rcs_batch(
+            target_llhs=target_llhs, max_workers=max_workers, **kwargs
+        )
+        expected = [
+            isce3.cal.measure_target_rcs(target_llh=cr.llh, **kwargs) for cr in crs
+        ]
+        np.testing.assert_allclose(rcs_values, expected, rtol=1e-12)
+
+    def test_out_of_bounds(self, rslc_data_20mhz, border_llhs):
+        d = rslc_data_20mhz
+
+        # Get LLH position of a target just outside of the image grid bounds.
+        llh = border_llhs["out"]
+
         # Check that an exception was raised.
         errmsg = (
             "target position in radar coordinates was outside of the supplied image"
@@ -143,7 +255,7 @@ class TestMeasureTargetRCS:
         )
         with pytest.raises(RuntimeError, match=errmsg):
             isce3.cal.measure_target_rcs(
-                target_llh=isce3.core.LLH(*llh),
+                target_llh=llh,
                 img_data=d["img_data"],
                 radar_grid=d["radar_grid"],
                 orbit=d["orbit"],
@@ -151,26 +263,18 @@ class TestMeasureTargetRCS:
                 ellipsoid=d["ellipsoid"],
             )
 
-    def test_near_border(self):
-        d = get_test_data()
+    def test_near_border(self, rslc_data_20mhz, border_llhs):
+        d = rslc_data_20mhz
 
         # Get LLH position of a target just *inside* of the image grid bounds, but too
         # close to the image border to extract a chip for upsampling.
-        llh = isce3.geometry.rdr2geo(
-            aztime=d["radar_grid"].sensing_mid,
-            range=d["radar_grid"].end_range - d["radar_grid"].range_pixel_spacing,
-            orbit=d["orbit"],
-            side=d["radar_grid"].lookside,
-            doppler=0.0,
-            wavelength=d["radar_grid"].wavelength,
-            ellipsoid=d["ellipsoid"],
-        )
+        llh = border_llhs["near"]
 
         # Check that an exception was raised.
         errmsg = "target is too close to image border -- consider reducing nchip"
         with pytest.raises(RuntimeError, match=errmsg):
             isce3.cal.measure_target_rcs(
-                target_llh=isce3.core.LLH(*llh),
+                target_llh=llh,
                 img_data=d["img_data"],
                 radar_grid=d["radar_grid"],
                 orbit=d["orbit"],
@@ -179,14 +283,19 @@ class TestMeasureTargetRCS:
             )
 
 
-@pytest.mark.parametrize("bandwidth", ["5mhz", "20mhz"])
-def test_estimate_abscal_factor(bandwidth):
+@pytest.fixture(scope="session", params=["5mhz", "20mhz"])
+def abscal_data(request) -> Dict[str, Any]:
+    """
+    Absolute calibration factors estimated from each RSLC product along with the
+    inputs used to estimate them, computed once per session.
+    """
+    bandwidth = request.param
     datadir = Path(iscetest.data) / "abscal"
     cr_csv = datadir / "REE_CORNER_REFLECTORS_INFO.csv"
     rslc_hdf5 = datadir / f"calib_slc_pass1_{bandwidth}.h5"
 
     # Parse corner reflector CSV file and RSLC HDF5 file.
-    corner_reflectors = list(isce3.cal.parse_triangular_trihedral_cr_csv(cr_csv))
+    corner_reflectors = list(parse_cr_csv(cr_csv))
 
     # Get RSLC product.
     rslc = nisar.products.readers.SLC(hdf5file=os.fspath(rslc_hdf5))
@@ -202,30 +311,49 @@ def test_estimate_abscal_factor(bandwidth):
         upsample_factor=128,
     )
 
-    # Check the "id" field of the output JSON-like data.
+    return dict(
+        corner_reflectors=corner_reflectors,
+        rslc=rslc,
+        freq=freq,
+        pol=pol,
+        abscal_info=abscal_info,
+    )
+
+
+def test_estimate_abscal_factor(abscal_data):
+    corner_reflectors = abscal_data["corner_reflectors"]
+    rslc = abscal_data["rslc"]
+    freq = abscal_data["freq"]
+    pol = abscal_data["pol"]
+    abscal_info = abscal_data["abscal_info"]
+
+    # Check the "id" field of the output data.
     cr_ids_expected = [cr.id for cr in corner_reflectors]
-    cr_ids = [d["id"] for d in abscal_info]
-    assert cr_ids == cr_ids_expected
+    assert list(abscal_info.id) == cr_ids_expected
 
     # Check that the estimated absolute radiometric calibration factor for each corner
     # reflector is approximately the same.
-    abscal_factors_db = np.asarray(
-        [pow2db(d["absolute_calibration_factor"]) for d in abscal_info]
-    )
+    abscal_factors_db = pow2db(abscal_info.absolute_calibration_factor)
     max_abscal_db = np.max(abscal_factors_db)
     min_abscal_db = np.min(abscal_factors_db)
     assert np.isclose(max_abscal_db, min_abscal_db, atol=0.15)
 
     orbit = rslc.getOrbit()
 
-    def orbit_contains(t: isce3.core.DateTime) -> bool:
-        return (t >= orbit.start_datetime) and (t <= orbit.end_datetime)
+    def to_datetime64(t: isce3.core.DateTime) -> np.datetime64:
+        return np.datetime64(t.isoformat(), "ns")
 
     # Check that the "timestamp" falls within the span of the orbit data included in the
     # RSLC product.
-    cr_times = [d["timestamp"] for d in abscal_info]
-    assert all(map(orbit_contains, cr_times))
+    cr_times = np.fromiter(
+        map(to_datetime64, abscal_info.timestamp),
+        dtype="datetime64[ns]",
+        count=len(abscal_info),
+    )
+    orbit_start = to_datetime64(orbit.start_datetime)
+    orbit_end = to_datetime64(orbit.end_datetime)
+    assert ((cr_times >= orbit_start) & (cr_times <= orbit_end)).all()
 
     # Check the "frequency" and "polarization" fields.
-    assert all(d["frequency"] == freq for d in abscal_info)
-    assert all(d["polarization"] == pol for d in abscal_info)
+    assert (abscal_info.frequency == freq).all()
+    assert (abscal_info.polarization == pol).all()